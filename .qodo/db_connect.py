@@ -40,21 +40,64 @@
     }
    ],
    "source": [
+    "import os\r\n",
+    "import socket\r\n",
     "import psycopg2\r\n",
+    "from psycopg2 import pool\r\n",
+    "from contextlib import contextmanager\r\n",
+    "\r\n",
+    "# Connection pool, created once and shared by every query\r\n",
+    "PG_POOL = None\r\n",
+    "\r\n",
+    "def set_nodelay(conn):\r\n",
+    "    \"\"\"Disable Nagle's algorithm on TCP connections to avoid 40ms delayed-ACK stalls\"\"\"\r\n",
+    "    sock = socket.socket(fileno=os.dup(conn.fileno()))\r\n",
+    "    try:\r\n",
+    "        if sock.family in (socket.AF_INET, socket.AF_INET6):\r\n",
+    "            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)\r\n",
+    "            if hasattr(socket, \"TCP_QUICKACK\"):\r\n",
+    "                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)\r\n",
+    "    finally:\r\n",
+    "        # Only closes the duplicated descriptor, the connection stays open\r\n",
+    "        sock.close()\r\n",
+    "\r\n",
+    "class NoDelayConnectionPool(pool.ThreadedConnectionPool):\r\n",
+    "    \"\"\"Thread-safe pool that disables Nagle's algorithm once per new connection\"\"\"\r\n",
+    "\r\n",
+    "    def _connect(self, key=None):\r\n",
+    "        conn = super()._connect(key)\r\n",
+    "        set_nodelay(conn)\r\n",
+    "        return conn\r\n",
+    "\r\n",
+    "@contextmanager\r\n",
+    "def get_conn():\r\n",
+    "    \"\"\"Borrow a connection from the pool and hand it back when done\"\"\"\r\n",
+    "    conn = PG_POOL.getconn()\r\n",
+    "    try:\r\n",
+    "        yield conn\r\n",
+    "    finally:\r\n",
+    "        PG_POOL.putconn(conn)\r\n",
     "\r\n",
     "try:\r\n",
     "    # Connect to your database\r\n",
-    "    conn = psycopg2.connect(\r\n",
-    "        host=\"localhost\",\r\n",
+    "    PG_POOL = NoDelayConnectionPool(\r\n",
+    "        minconn=2,\r\n",
+    "        maxconn=10,\r\n",
+    "        # A leading \"/\" makes libpq use the Unix-domain socket in that directory;\r\n",
+    "        # set PGHOST to a hostname when the database is not colocated\r\n",
+    "        host=os.environ.get(\"PGHOST\", \"/var/run/postgresql\"),\r\n",
     "        database=\"mydb\",\r\n",
     "        user=\"postgres\",\r\n",
-    "        password=\"yourpassword\"  # replace with your PostgreSQL password\r\n",
+    "        password=\"yourpassword\",  # replace with your PostgreSQL password\r\n",
+    "        keepalives=1,\r\n",
+    "        keepalives_idle=30\r\n",
     "    )\r\n",
     "    \r\n",
-    "    # Create a cursor object\r\n",
-    "    cur = conn.cursor()\r\n",
-    "    \r\n",
-    "    print(\"Connection successful!\")\r\n",
+    "    with get_conn() as conn:\r\n",
+    "        # Create a cursor object\r\n",
+    "        cur = conn.cursor()\r\n",
+    "        \r\n",
+    "        print(\"Connection successful!\")\r\n",
     "\r\n",
     "except Exception as e:\r\n",
     "    print(\"Error connecting to database:\", e)"
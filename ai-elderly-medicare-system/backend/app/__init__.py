@@ -8,25 +8,58 @@ __description__ = "Advanced healthcare management system for elderly patients wi
 
 import os
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_login import LoginManager, current_user
-from flask_mail import Mail
-from flask_bcrypt import Bcrypt
-from flask_cors import CORS
-from flask_wtf.csrf import CSRFProtect
-from datetime import timedelta
+from flask_login import current_user
+from datetime import datetime
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
-import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Flask extensions, constructed once by _init_extensions(); tests may swap entries
+extensions = {}
+
+def _init_extensions():
+    """Construct the Flask extensions on first use."""
+    if not extensions:
+        from flask_sqlalchemy import SQLAlchemy
+        from flask_migrate import Migrate
+        from flask_login import LoginManager
+        from flask_mail import Mail
+        from flask_caching import Cache
+        from flask_wtf.csrf import CSRFProtect
+        
+        extensions.update(
+            db=SQLAlchemy(),
+            migrate=Migrate(),
+            login_manager=LoginManager(),
+            mail=Mail(),
+            csrf=CSRFProtect(),
+            cache=Cache(),
+        )
+    return extensions
+
+def __getattr__(name):
+    """Expose the extensions as module attributes, e.g. ``from app import db``."""
+    if name in ('db', 'migrate', 'login_manager', 'mail', 'csrf', 'cache'):
+        return _init_extensions()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Unread notification counts are cached briefly to avoid a COUNT(*) per render.
+# Notifications are written by Celery workers that can't reach this cache, so
+# there is no invalidation: a count may be up to UNREAD_CACHE_TIMEOUT seconds stale
+UNREAD_CACHE_TIMEOUT = 30
 
-# Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
-login_manager = LoginManager()
-mail = Mail()
-bcrypt = Bcrypt()
-csrf = CSRFProtect()
+def unread_cache_key(user_id):
+    """Cache key for a user's unread notification count."""
+    return f'unread:{user_id}'
+
+# Dashboard AJAX counters are polled every few seconds; with no invalidation,
+# the short TTL alone bounds how stale they get
+DASHBOARD_DATA_CACHE_TIMEOUT = 15
+
+def dashboard_data_cache_key(user_id):
+    """Cache key for a user's dashboard AJAX payload."""
+    return f'dashdata:{user_id}'
 
 def create_app(config_class=None):
     """Create and configure the Flask application."""
@@ -43,14 +76,16 @@ def create_app(config_class=None):
     app.config.from_object(config_class)
     
     # Initialize extensions
-    db.init_app(app)
-    migrate.init_app(app, db)
-    login_manager.init_app(app)
-    mail.init_app(app)
-    bcrypt.init_app(app)
-    csrf.init_app(app)
+    ext = _init_extensions()
+    ext['db'].init_app(app)
+    ext['migrate'].init_app(app, ext['db'])
+    ext['login_manager'].init_app(app)
+    ext['mail'].init_app(app)
+    ext['csrf'].init_app(app)
+    ext['cache'].init_app(app)
     
     # Enable CORS for API routes
+    from flask_cors import CORS
     CORS(app, resources={r"/api/*": {"origins": app.config.get('ALLOWED_ORIGINS', [])}})
     
     # Configure logging
@@ -62,7 +97,13 @@ def create_app(config_class=None):
         file_handler.setFormatter(logging.Formatter(
             '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'))
         file_handler.setLevel(logging.INFO)
-        app.logger.addHandler(file_handler)
+        
+        # Request threads only enqueue records; a background thread writes them to disk
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        app.logger.addHandler(QueueHandler(log_queue))
         app.logger.setLevel(logging.INFO)
         app.logger.info('AI Elderly Medicare startup')
     
@@ -102,7 +143,7 @@ def register_blueprints(app):
 
 def register_error_handlers(app):
     """Register error handlers."""
-    from flask import render_template
+    db = extensions['db']
     
     @app.errorhandler(403)
     def forbidden_error(error):
@@ -124,7 +165,9 @@ def register_error_handlers(app):
     
     @app.errorhandler(500)
     def internal_error(error):
-        db.session.rollback()
+        # Only roll back if the request actually opened a transaction
+        if db.session.in_transaction():
+            db.session.rollback()
         if request.path.startswith('/api/'):
             return jsonify({
                 'status': 'error',
@@ -145,28 +188,32 @@ def register_error_handlers(app):
 def register_context_processors(app):
     """Register context processors."""
     from .models import Notification
+    cache = extensions['cache']
     
     @app.context_processor
-    def inject_now():
-        return {'now': datetime.utcnow()}
-    
-    @app.context_processor
-    def inject_user():
-        return dict(current_user=current_user)
-    
-    @app.context_processor
-    def inject_notifications():
+    def inject_common():
+        # One processor per render instead of three separate calls and dict merges
+        ctx = {
+            'now': datetime.utcnow(),
+            'current_user': current_user,
+            'unread_notifications': 0
+        }
         if current_user.is_authenticated:
-            unread_count = Notification.query.filter_by(
-                user_id=current_user.id,
-                is_read=False
-            ).count()
-            return {'unread_notifications': unread_count}
-        return {'unread_notifications': 0}
+            key = unread_cache_key(current_user.id)
+            unread_count = cache.get(key)
+            if unread_count is None:
+                unread_count = Notification.query.filter_by(
+                    user_id=current_user.id,
+                    is_read=False
+                ).count()
+                cache.set(key, unread_count, timeout=UNREAD_CACHE_TIMEOUT)
+            ctx['unread_notifications'] = unread_count
+        return ctx
 
 def register_shell_context(app):
     """Register shell context objects."""
     from .models import User, Role, Permission, Notification, ActivityLog
+    db = extensions['db']
     
     @app.shell_context_processor
     def make_shell_context():
@@ -183,6 +230,7 @@ def register_commands(app):
     """Register Click commands."""
     import click
     from .models import User, Role
+    db = extensions['db']
     
     @app.cli.command()
     @click.argument('test_names', nargs=-1)
@@ -201,10 +249,11 @@ def register_commands(app):
     @click.option('--password', prompt=True, hide_input=True, confirmation_prompt=True, help='The password')
     def create_admin(username, email, password):
         """Create an admin user."""
-        from werkzeug.security import generate_password_hash
+        from .security import password_hasher
         
         # Check if user already exists
-        if User.query.filter_by(email=email).first() is not None:
+        from sqlalchemy import exists
+        if db.session.query(exists().where(User.email == email)).scalar():
             click.echo('Error: Email already registered.')
             return
         
@@ -212,7 +261,7 @@ def register_commands(app):
         user = User(
             username=username,
             email=email,
-            password=generate_password_hash(password),
+            password=password_hasher.hash(password),
             is_admin=True,
             is_active=True,
             email_verified=True
@@ -246,25 +295,38 @@ def register_commands(app):
             'patient': ['view_profile', 'manage_appointments', 'view_medications']
         }
         
-        for role_name, permissions in roles_permissions.items():
-            role = Role.query.filter_by(name=role_name).first()
-            if role is None:
-                role = Role(name=role_name)
-                db.session.add(role)
-            
-            # Clear existing permissions
-            role.permissions = []
-            
-            # Add permissions
-            for perm_name in permissions:
-                permission = Permission.query.filter_by(name=perm_name).first()
-                if permission is None:
-                    permission = Permission(name=perm_name, description=f'Can {perm_name.replace("_", " ")}')
-                    db.session.add(permission)
-                role.permissions.append(permission)
-        
+        all_perm_names = sorted({p for perms in roles_permissions.values() for p in perms})
+
+        # Fetch existing role and permission names in one query each
+        existing_roles = {
+            name for (name,) in db.session.query(Role.name).filter(Role.name.in_(roles_permissions))
+        }
+        existing_perms = {
+            name for (name,) in db.session.query(Permission.name).filter(Permission.name.in_(all_perm_names))
+        }
+
+        # Insert the missing rows with one executemany per table
+        db.session.bulk_insert_mappings(Role, [
+            {'name': role_name} for role_name in roles_permissions if role_name not in existing_roles
+        ])
+        db.session.bulk_insert_mappings(Permission, [
+            {'name': perm_name, 'description': f'Can {perm_name.replace("_", " ")}'}
+            for perm_name in all_perm_names if perm_name not in existing_perms
+        ])
+
+        role_ids = dict(db.session.query(Role.name, Role.id).filter(Role.name.in_(roles_permissions)))
+        perm_ids = dict(db.session.query(Permission.name, Permission.id).filter(Permission.name.in_(all_perm_names)))
+
+        # Replace existing role/permission links with one DELETE and one INSERT
+        role_permissions = Role.permissions.property.secondary
+        db.session.execute(
+            role_permissions.delete().where(role_permissions.c.role_id.in_(role_ids.values()))
+        )
+        db.session.execute(role_permissions.insert(), [
+            {'role_id': role_ids[role_name], 'permission_id': perm_ids[perm_name]}
+            for role_name, permissions in roles_permissions.items()
+            for perm_name in permissions
+        ])
+
         db.session.commit()
         click.echo('Database seeded with default roles and permissions.')
-
-# Import models to ensure they are registered with SQLAlchemy
-from . import models
\ No newline at end of file
@@ -3,37 +3,54 @@ Authentication routes for user login, registration, and token management
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, exists, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import Optional
+import logging
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 
-from app.models.database import get_db
-from app.models.user import User, UserRole, UserStatus
+from app.config import settings
+from app.database import get_async_db
+from app.models.user import LAST_LOGIN_KEY, User, UserRole, UserStatus
 from app.schemas.auth import UserCreate, UserLogin, Token, UserResponse
-from app.security import create_access_token, verify_password, get_password_hash, verify_token
+from app.security import create_access_token, verify_password, get_password_hash, verify_token_cached
 from app.services.user_service import UserService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 security = HTTPBearer()
+redis_client = aioredis.from_url(
+    settings.REDIS_URL,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+)
+
+# Columns needed to authenticate and build the login response, selected
+# directly so login doesn't hydrate a full ORM User
+LOGIN_COLUMNS = (
+    User.id, User.username, User.email, User.hashed_password,
+    User.first_name, User.last_name, User.phone_number,
+    User.role, User.status, User.is_active, User.is_verified,
+    User.created_at, User.last_login,
+)
+
+# Login lookups built once at import; each execution only binds :login, and
+# the driver reuses the server-side prepared statement for the same SQL
+LOGIN_BY_EMAIL = select(*LOGIN_COLUMNS).where(func.lower(User.email) == bindparam("login"))
+LOGIN_BY_USERNAME = select(*LOGIN_COLUMNS).where(func.lower(User.username) == bindparam("login"))
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     
-    # Check if user already exists
-    existing_user = db.query(User).filter(
-        (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
-    
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email or username already exists"
-        )
-    
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    # Create new user; the unique constraints on email/username reject duplicates
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
     
     new_user = User(
         username=user_data.username,
@@ -47,55 +64,74 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email or username already exists"
+        )
     
-    return UserResponse.from_orm(new_user)
+    return UserResponse.model_validate(new_user)
 
 @router.post("/login", response_model=Token)
-async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Authenticate user and return access token"""
     
-    # Find user by email or username
-    user = db.query(User).filter(
-        (User.email == user_credentials.username) | (User.username == user_credentials.username)
-    ).first()
-    
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    # Find user by email or username; probe the likely column first so each
+    # query can use its lower() expression index instead of an OR scan
+    login = user_credentials.username.lower()
+    lookups = (LOGIN_BY_EMAIL, LOGIN_BY_USERNAME) if "@" in login else (LOGIN_BY_USERNAME, LOGIN_BY_EMAIL)
+    row = None
+    for lookup in lookups:
+        row = (await db.execute(lookup, {"login": login})).first()
+        if row:
+            break
+    
+    if not row or not await run_in_threadpool(verify_password, user_credentials.password, row.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not user.is_active or user.status != UserStatus.ACTIVE:
+    if not row.is_active or row.status != UserStatus.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Account is not active",
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Record last login in Redis; flush_last_logins writes it to the users
+    # table in one batch instead of an UPDATE + commit on every login
+    user_data = row._asdict()
+    del user_data["hashed_password"]
+    user_data["last_login"] = datetime.utcnow()
+    try:
+        await redis_client.hset(LAST_LOGIN_KEY, str(row.id), user_data["last_login"].isoformat())
+    except RedisError as e:
+        # A Redis outage only loses the last_login update, never the login
+        logger.warning(f"Failed to buffer last_login for user {row.id}: {e}")
+    user_response = UserResponse(**user_data)
     
     # Create access token
-    access_token = create_access_token(data={"sub": str(user.id), "username": user.username})
+    access_token = create_access_token(data={"sub": str(user_response.id), "username": user_response.username})
     
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "user": UserResponse.from_orm(user)
+        "user": user_response
     }
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current authenticated user information"""
     
     # Verify token and get user
-    payload = verify_token(credentials.credentials)
+    payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
     user_id = payload.get("sub")
     
     if user_id is None:
@@ -104,24 +140,24 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     
-    return UserResponse.from_orm(user)
+    return UserResponse.model_validate(user)
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Refresh access token"""
     
     # Verify current token
-    payload = verify_token(credentials.credentials)
+    payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
     user_id = payload.get("sub")
     
     if user_id is None:
@@ -130,7 +166,7 @@ async def refresh_token(
             detail="Could not validate credentials",
         )
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if user is None or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -143,7 +179,7 @@ async def refresh_token(
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "user": UserResponse.from_orm(user)
+        "user": UserResponse.model_validate(user)
     }
 
 @router.post("/logout")
@@ -161,15 +197,15 @@ async def change_password(
     old_password: str,
     new_password: str,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Change user password"""
     
     # Get current user
-    payload = verify_token(credentials.credentials)
+    payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
     user_id = payload.get("sub")
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -177,24 +213,24 @@ async def change_password(
         )
     
     # Verify old password
-    if not verify_password(old_password, user.hashed_password):
+    if not await run_in_threadpool(verify_password, old_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password",
         )
     
     # Update password
-    user.hashed_password = get_password_hash(new_password)
-    db.commit()
+    user.hashed_password = await run_in_threadpool(get_password_hash, new_password)
+    await db.commit()
     
     return {"message": "Password changed successfully"}
 
 @router.post("/forgot-password")
-async def forgot_password(email: str, db: Session = Depends(get_db)):
+async def forgot_password(email: str, db: AsyncSession = Depends(get_async_db)):
     """Request password reset"""
     
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+    user_exists = (await db.execute(select(exists().where(User.email == email)))).scalar()
+    if not user_exists:
         # Don't reveal if email exists or not
         return {"message": "If the email exists, a reset link has been sent"}
     
@@ -212,7 +248,7 @@ async def verify_user_token(
     """Verify if token is valid"""
     
     try:
-        payload = verify_token(credentials.credentials)
+        payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
         return {"valid": True, "user_id": payload.get("sub")}
     except HTTPException:
         return {"valid": False}
\ No newline at end of file
@@ -2,48 +2,72 @@
 Authentication API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
+import re
 
-from app.database import get_db
+from app.database import get_db_context
 from app.models.user import User, UserRole, UserStatus
-from app.security import create_access_token, verify_password, get_password_hash, verify_token
-from app.services.auth_service import AuthService
-from app.services.email_service import EmailService
-from app.utils.validators import validate_email, validate_password
+from app.security import create_access_token, verify_password, get_password_hash, verify_token_cached, revoke_token
+from app.services.auth_service import AuthService, get_auth_service
+from app.services.email_service import email_service, enqueue_email
+from app.utils.validators import validate_email
 from app.utils.exceptions import AuthenticationError, ValidationError
 
+# Served by uvicorn with --loop uvloop --http httptools (see deployment/docker/Dockerfile);
+# KDF work is pushed to the threadpool so the loop stays free for other requests
 router = APIRouter()
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
+# Access token lifetimes for normal and "remember me" logins
+ACCESS_TOKEN_SHORT = timedelta(minutes=30)
+ACCESS_TOKEN_LONG = timedelta(days=7)
+ACCESS_TOKEN_SHORT_SECS = 1800
+ACCESS_TOKEN_LONG_SECS = 604800
+
+# Same rules as app.utils.validators.validate_password, checked in one regex pass
+PASSWORD_RE = re.compile(
+    r'^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)(?=.*[!@#$%^&*(),.?":{}|<>]).{8,}$',
+    re.DOTALL
+)
+PASSWORD_ERROR = 'Password must be at least 8 characters with uppercase, lowercase, and number'
+
+def check_password_strength(v: str) -> str:
+    """Shared field validator body for the password fields below"""
+    if not PASSWORD_RE.match(v):
+        raise ValueError(PASSWORD_ERROR)
+    return v
+
 # Pydantic models for request/response
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, StringConstraints, field_validator
+from typing_extensions import Annotated
+
+# Same pattern as app.utils.validators.validate_email, matched by pydantic-core
+# instead of email-validator. The verification email proves the address anyway.
+Email = Annotated[str, StringConstraints(
+    strip_whitespace=True,
+    max_length=254,
+    pattern=r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+)]
 
 class UserRegister(BaseModel):
-    username: str
-    email: EmailStr
+    username: Annotated[str, StringConstraints(min_length=3)]
+    email: Email
     password: str
     first_name: str
     last_name: str
     phone_number: Optional[str] = None
     role: Optional[UserRole] = UserRole.PATIENT
     
-    @validator('username')
-    def validate_username(cls, v):
-        if len(v) < 3:
-            raise ValueError('Username must be at least 3 characters long')
-        return v
-    
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def validate_password_strength(cls, v):
-        if not validate_password(v):
-            raise ValueError('Password must be at least 8 characters with uppercase, lowercase, and number')
-        return v
+        return check_password_strength(v)
 
 class UserLogin(BaseModel):
     username: str
@@ -63,8 +87,7 @@ class UserResponse(BaseModel):
     created_at: datetime
     last_login: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -72,54 +95,68 @@ class TokenResponse(BaseModel):
     expires_in: int
     user: UserResponse
 
+class RefreshTokenResponse(BaseModel):
+    access_token: str
+    token_type: str
+    expires_in: int
+
 class PasswordChangeRequest(BaseModel):
     current_password: str
     new_password: str
     
-    @validator('new_password')
+    @field_validator('new_password')
+    @classmethod
     def validate_new_password(cls, v):
-        if not validate_password(v):
-            raise ValueError('Password must be at least 8 characters with uppercase, lowercase, and number')
-        return v
+        return check_password_strength(v)
 
 class PasswordResetRequest(BaseModel):
-    email: EmailStr
+    email: Email
 
 class PasswordResetConfirm(BaseModel):
     token: str
     new_password: str
     
-    @validator('new_password')
+    @field_validator('new_password')
+    @classmethod
     def validate_new_password(cls, v):
-        if not validate_password(v):
-            raise ValueError('Password must be at least 8 characters with uppercase, lowercase, and number')
-        return v
+        return check_password_strength(v)
+
+def _json_response(model: BaseModel, status_code: int = status.HTTP_200_OK) -> Response:
+    """Serialize a response model to JSON bytes in pydantic-core, skipping FastAPI's re-validation"""
+    return Response(content=model.model_dump_json(), media_type="application/json", status_code=status_code)
+
+def _send_verification_email(user_id: int, email: str, first_name: str):
+    """Email queue job: create a verification token and email it"""
+    # Runs after the request's session is closed, so it opens its own
+    with get_db_context() as db:
+        token = AuthService(db).generate_verification_token(user_id)
+    
+    email_service.send_verification_email(email, first_name, token)
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserRegister, 
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Register a new user"""
     try:
-        auth_service = AuthService(db)
-        
         # Check if user already exists
-        if auth_service.get_user_by_email(user_data.email):
+        conflict = auth_service.find_email_or_username_conflict(user_data.email, user_data.username)
+        if conflict == "email":
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this email already exists"
             )
         
-        if auth_service.get_user_by_username(user_data.username):
+        if conflict == "username":
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
         
-        # Create user
-        user = auth_service.create_user(
+        # Create user; password hashing runs off the event loop
+        user = await run_in_threadpool(
+            auth_service.create_user,
             username=user_data.username,
             email=user_data.email,
             password=user_data.password,
@@ -129,32 +166,28 @@ async def register_user(
             role=user_data.role
         )
         
-        # Send verification email
-        email_service = EmailService()
-        background_tasks.add_task(
-            email_service.send_verification_email,
-            user.email,
-            user.first_name,
-            auth_service.generate_verification_token(user.id)
-        )
+        # Token generation and sending happen on the paced email queue
+        await enqueue_email(_send_verification_email, user.id, user.email, user.first_name)
         
-        logger.info(f"User registered successfully: {user.username}")
-        return UserResponse.from_orm(user)
+        logger.info("User registered successfully: %s", user.username)
+        return _json_response(UserResponse.model_validate(user), status.HTTP_201_CREATED)
         
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Registration error: {e}")
+        logger.error("Registration error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Registration failed")
 
 @router.post("/login", response_model=TokenResponse)
-async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_credentials: UserLogin, auth_service: AuthService = Depends(get_auth_service)):
     """Authenticate user and return access token"""
     try:
-        auth_service = AuthService(db)
-        
-        # Authenticate user
-        user = auth_service.authenticate_user(user_credentials.username, user_credentials.password)
+        # Authenticate user; password verification runs off the event loop
+        user = await run_in_threadpool(
+            auth_service.authenticate_user, user_credentials.username, user_credentials.password
+        )
         
         if not user:
             raise HTTPException(
@@ -173,36 +206,41 @@ async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db))
         auth_service.update_last_login(user.id)
         
         # Create access token
-        expires_delta = timedelta(days=7) if user_credentials.remember_me else timedelta(minutes=30)
+        if user_credentials.remember_me:
+            expires_delta, expires_in = ACCESS_TOKEN_LONG, ACCESS_TOKEN_LONG_SECS
+        else:
+            expires_delta, expires_in = ACCESS_TOKEN_SHORT, ACCESS_TOKEN_SHORT_SECS
         access_token = create_access_token(
             data={"sub": str(user.id), "username": user.username},
             expires_delta=expires_delta
         )
         
-        logger.info(f"User logged in successfully: {user.username}")
+        logger.info("User logged in successfully: %s", user.username)
         
-        return TokenResponse(
+        return _json_response(TokenResponse(
             access_token=access_token,
             token_type="bearer",
-            expires_in=int(expires_delta.total_seconds()),
-            user=UserResponse.from_orm(user)
-        )
+            expires_in=expires_in,
+            user=UserResponse.model_validate(user)
+        ))
         
     except AuthenticationError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Login error: {e}")
+        logger.error("Login error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Login failed")
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Get current authenticated user information"""
     try:
         # Verify token and get user
-        payload = verify_token(credentials.credentials)
+        payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
         user_id = payload.get("sub")
         
         if user_id is None:
@@ -211,8 +249,7 @@ async def get_current_user(
                 detail="Could not validate credentials",
             )
         
-        auth_service = AuthService(db)
-        user = auth_service.get_user_by_id(int(user_id))
+        user = auth_service.get_active_user_for_jwt(int(user_id))
         
         if user is None:
             raise HTTPException(
@@ -220,21 +257,23 @@ async def get_current_user(
                 detail="User not found",
             )
         
-        return UserResponse.from_orm(user)
+        return _json_response(UserResponse.model_validate(user))
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Get current user error: {e}")
+        logger.error("Get current user error: %s", e)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
 
-@router.post("/refresh", response_model=TokenResponse)
+@router.post("/refresh", response_model=RefreshTokenResponse)
 async def refresh_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Refresh access token"""
     try:
         # Verify current token
-        payload = verify_token(credentials.credentials)
+        payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
         user_id = payload.get("sub")
         
         if user_id is None:
@@ -243,10 +282,8 @@ async def refresh_token(
                 detail="Could not validate credentials",
             )
         
-        auth_service = AuthService(db)
-        user = auth_service.get_user_by_id(int(user_id))
-        
-        if user is None or not user.is_active:
+        # The client already has the user from /login or /me; only the active flag matters here
+        if not auth_service.is_user_active(int(user_id)):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found or inactive",
@@ -254,34 +291,34 @@ async def refresh_token(
         
         # Create new access token
         access_token = create_access_token(
-            data={"sub": str(user.id), "username": user.username}
+            data={"sub": user_id, "username": payload.get("username")}
         )
         
-        return TokenResponse(
+        return _json_response(RefreshTokenResponse(
             access_token=access_token,
             token_type="bearer",
-            expires_in=1800,  # 30 minutes
-            user=UserResponse.from_orm(user)
-        )
+            expires_in=1800  # 30 minutes
+        ))
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Token refresh error: {e}")
+        logger.error("Token refresh error: %s", e)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not refresh token")
 
 @router.post("/change-password")
 async def change_password(
     password_data: PasswordChangeRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Change user password"""
     try:
         # Get current user
-        payload = verify_token(credentials.credentials)
+        payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
         user_id = payload.get("sub")
         
-        auth_service = AuthService(db)
-        user = auth_service.get_user_by_id(int(user_id))
+        user = auth_service.get_active_user_for_jwt(int(user_id))
         
         if not user:
             raise HTTPException(
@@ -290,96 +327,90 @@ async def change_password(
             )
         
         # Verify current password
-        if not verify_password(password_data.current_password, user.hashed_password):
+        if not await run_in_threadpool(verify_password, password_data.current_password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect current password",
             )
         
         # Update password
-        auth_service.change_password(user.id, password_data.new_password)
+        await run_in_threadpool(auth_service.change_password, user.id, password_data.new_password)
         
-        logger.info(f"Password changed for user: {user.username}")
+        logger.info("Password changed for user: %s", user.username)
         return {"message": "Password changed successfully"}
         
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Password change error: {e}")
+        logger.error("Password change error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Password change failed")
 
 @router.post("/forgot-password")
 async def forgot_password(
     request: PasswordResetRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Request password reset"""
     try:
-        auth_service = AuthService(db)
         user = auth_service.get_user_by_email(request.email)
         
         if user:
             # Generate reset token
             reset_token = auth_service.generate_password_reset_token(user.id)
             
-            # Send reset email
-            email_service = EmailService()
-            background_tasks.add_task(
+            # Send reset email via the paced email queue
+            await enqueue_email(
                 email_service.send_password_reset_email,
                 user.email,
                 user.first_name,
                 reset_token
             )
             
-            logger.info(f"Password reset requested for: {request.email}")
+            logger.info("Password reset requested for: %s", request.email)
         
         # Always return success to prevent email enumeration
         return {"message": "If the email exists, a reset link has been sent"}
         
     except Exception as e:
-        logger.error(f"Password reset request error: {e}")
+        logger.error("Password reset request error: %s", e)
         return {"message": "If the email exists, a reset link has been sent"}
 
 @router.post("/reset-password")
 async def reset_password(
     reset_data: PasswordResetConfirm,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Confirm password reset"""
     try:
-        auth_service = AuthService(db)
-        
-        # Verify reset token and get user
-        user_id = auth_service.verify_password_reset_token(reset_data.token)
-        
-        if not user_id:
+        # Consume the token and set the password in one transaction
+        if not await run_in_threadpool(
+            auth_service.reset_password_with_token, reset_data.token, reset_data.new_password
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid or expired reset token"
             )
         
-        # Reset password
-        auth_service.reset_password(user_id, reset_data.new_password)
-        
-        logger.info(f"Password reset completed for user ID: {user_id}")
+        logger.info("Password reset completed")
         return {"message": "Password reset successfully"}
         
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Password reset error: {e}")
+        logger.error("Password reset error: %s", e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Password reset failed")
 
 @router.post("/verify-email")
 async def verify_email(
     token: str,
-    db: Session = Depends(get_db)
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Verify user email address"""
     try:
-        auth_service = AuthService(db)
-        
         # Verify email token
         user_id = auth_service.verify_email_token(token)
         
@@ -392,26 +423,27 @@ async def verify_email(
         # Mark email as verified
         auth_service.verify_user_email(user_id)
         
-        logger.info(f"Email verified for user ID: {user_id}")
+        logger.info("Email verified for user ID: %s", user_id)
         return {"message": "Email verified successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Email verification error: {e}")
+        logger.error("Email verification error: %s", e)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email verification failed")
 
 @router.post("/logout")
 async def logout_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    """Logout user (client should discard token)"""
+    """Logout user and revoke the token"""
     try:
-        # In a production system, you might want to blacklist the token
-        # For now, we'll just return a success message
+        await run_in_threadpool(revoke_token, credentials.credentials)
         logger.info("User logged out")
         return {"message": "Successfully logged out"}
         
     except Exception as e:
-        logger.error(f"Logout error: {e}")
+        logger.error("Logout error: %s", e)
         return {"message": "Logout completed"}
 
 @router.get("/verify-token")
@@ -420,7 +452,7 @@ async def verify_user_token(
 ):
     """Verify if token is valid"""
     try:
-        payload = verify_token(credentials.credentials)
+        payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
         return {
             "valid": True, 
             "user_id": payload.get("sub"),
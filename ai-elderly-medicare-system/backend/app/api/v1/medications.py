@@ -2,27 +2,36 @@
 Medication management API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response
+from sqlalchemy import exists, func, inspect as sa_inspect, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, load_only
 from typing import List, Optional
 from datetime import datetime, date
+import asyncio
 import logging
 
-from app.database import get_db
-from app.models.medication import Medication, MedicationType, MedicationStatus, FrequencyType
+import msgspec
+import redis.asyncio as aioredis
+from redis import RedisError
+
+from app.config import settings
+from app.database import get_async_db
+from app.deps import get_current_user
+from app.models.medication import Medication, MedicationDoseNote, MedicationType, MedicationStatus, FrequencyType
 from app.models.user import User, UserRole
 from app.models.patient import Patient
-from app.security import verify_token
-from app.services.auth_service import AuthService
-from app.services.medication_service import MedicationService
+from app.services.medication_service import MedicationService, enqueue_medication_job
 from app.services.notification_service import NotificationService
 from app.utils.exceptions import ValidationError, PermissionError
 
 router = APIRouter()
-security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
+# Roles allowed to create and modify medications
+MEDICATION_WRITE_ROLES = frozenset({UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE})
+
 # Pydantic models
 from pydantic import BaseModel, validator
 
@@ -125,12 +134,44 @@ class MedicationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Field names read off each ORM row, including the computed properties
+MEDICATION_RESPONSE_FIELDS = tuple(MedicationResponse.model_fields)
+
+def _medication_to_response(medication: Medication) -> MedicationResponse:
+    """Build a MedicationResponse from a trusted ORM row without re-validating each field"""
+    return MedicationResponse.model_construct(
+        **{field: getattr(medication, field) for field in MEDICATION_RESPONSE_FIELDS}
+    )
+
+# Columns the list endpoint loads: the response's column fields plus the
+# extra inputs of its computed properties; nothing else is hydrated
+MEDICATION_LIST_COLUMNS = load_only(*(
+    getattr(Medication, column.key)
+    for column in sa_inspect(Medication).column_attrs
+    if column.key in MEDICATION_RESPONSE_FIELDS or column.key == "next_refill_due"
+))
+
+# msgspec mirror of MedicationResponse for the list endpoint; Structs are
+# built without validation and encoded straight to JSON bytes
+MedicationListItem = msgspec.defstruct(
+    "MedicationListItem",
+    [(name, field.annotation) for name, field in MedicationResponse.model_fields.items()]
+)
+MEDICATION_LIST_ENCODER = msgspec.json.Encoder()
+
+def _medication_to_list_item(medication: Medication) -> MedicationListItem:
+    """Build a MedicationListItem from an ORM row"""
+    return MedicationListItem(
+        **{field: getattr(medication, field) for field in MEDICATION_RESPONSE_FIELDS}
+    )
+
 class MedicationListResponse(BaseModel):
     medications: List[MedicationResponse]
-    total: int
-    page: int
+    total: Optional[int] = None  # not computed for cursor requests
+    page: Optional[int] = None
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[int] = None  # pass as ?cursor= to fetch the following page
 
 class DoseTakenRequest(BaseModel):
     taken_at: Optional[datetime] = None
@@ -141,71 +182,178 @@ class RefillRequest(BaseModel):
     refills: Optional[int] = 0
     pharmacy_notes: Optional[str] = None
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    """Get current authenticated user"""
-    payload = verify_token(credentials.credentials)
-    user_id = payload.get("sub")
+async def _load_medication_with_owner(db: AsyncSession, medication_id: int):
+    """Fetch a medication with its owner's user ID in one query"""
+    result = await db.execute(
+        select(Medication, Patient.user_id)
+        .join(Patient, Patient.id == Medication.patient_id)
+        .where(Medication.id == medication_id)
+    )
+    row = result.first()
     
-    if user_id is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Medication not found"
+        )
     
-    auth_service = AuthService(db)
-    user = auth_service.get_user_by_id(int(user_id))
+    return row
+
+def _check_medication_owner(current_user: User, owner_user_id: int) -> None:
+    """Patients may only access their own medications"""
+    if current_user.role == UserRole.PATIENT and owner_user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions to access this medication"
+        )
+
+async def require_medication_access(
+    medication_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> Medication:
+    """Dependency: load a medication the current user may access"""
+    if current_user.role != UserRole.PATIENT:
+        # No ownership rule applies, so skip the owner join; Session.get also
+        # returns an instance already in the identity map without a SELECT
+        medication = await db.get(Medication, medication_id)
+        if medication is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Medication not found"
+            )
+        return medication
     
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    medication, owner_user_id = await _load_medication_with_owner(db, medication_id)
+    _check_medication_owner(current_user, owner_user_id)
+    return medication
+
+# Serialized single-medication reads cached in Redis under a per-medication
+# version; writes bump the version so stale entries are simply never read again
+MEDICATION_CACHE_TTL = 60
+MEDICATION_CACHE_LOCK_TTL = 5
+MEDICATION_CACHE_WAIT = 0.05
+MEDICATION_CACHE_WAIT_ATTEMPTS = 10
+
+medication_cache = aioredis.from_url(
+    settings.REDIS_URL,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+)
+
+class CachedMedication(msgspec.Struct):
+    owner_user_id: int
+    medication: msgspec.Raw  # encoded MedicationResponse JSON
+
+_cached_medication_encoder = msgspec.json.Encoder()
+_cached_medication_decoder = msgspec.json.Decoder(CachedMedication)
+
+def _medication_version_key(medication_id: int) -> str:
+    return f"med:{medication_id}:ver"
+
+async def _invalidate_medication_cache(medication_id: int) -> None:
+    """Bump the medication's cache version after a write"""
+    try:
+        await medication_cache.incr(_medication_version_key(medication_id))
+    except RedisError as e:
+        logger.warning("Could not invalidate cached medication %s: %s", medication_id, e)
+
+async def _load_cached_medication(db: AsyncSession, medication_id: int) -> CachedMedication:
+    """Load a medication from the database into its cacheable form"""
+    medication, owner_user_id = await _load_medication_with_owner(db, medication_id)
+    return CachedMedication(
+        owner_user_id=owner_user_id,
+        medication=msgspec.Raw(MEDICATION_LIST_ENCODER.encode(_medication_to_list_item(medication)))
+    )
+
+async def _get_cached_medication(db: AsyncSession, medication_id: int) -> CachedMedication:
+    """
+    Read a medication through the cache; on a miss a single request (holding
+    a SET NX lock) fills the entry while concurrent readers wait for it
+    """
+    version = await medication_cache.get(_medication_version_key(medication_id))
+    key = f"med:{medication_id}:v{int(version or 0)}"
     
-    return user
+    payload = await medication_cache.get(key)
+    if payload is not None:
+        return _cached_medication_decoder.decode(payload)
+    
+    for _ in range(MEDICATION_CACHE_WAIT_ATTEMPTS):
+        if await medication_cache.set(f"{key}:lock", 1, nx=True, ex=MEDICATION_CACHE_LOCK_TTL):
+            try:
+                cached = await _load_cached_medication(db, medication_id)
+                await medication_cache.set(
+                    key, _cached_medication_encoder.encode(cached), ex=MEDICATION_CACHE_TTL
+                )
+                return cached
+            finally:
+                await medication_cache.delete(f"{key}:lock")
+        
+        await asyncio.sleep(MEDICATION_CACHE_WAIT)
+        payload = await medication_cache.get(key)
+        if payload is not None:
+            return _cached_medication_decoder.decode(payload)
+    
+    # The filling request is taking too long; read the row directly
+    return await _load_cached_medication(db, medication_id)
+
+async def _setup_medication_reminders(db: AsyncSession, medication_id: int):
+    """Queued job: create the reminder schedule for a new medication"""
+    await db.run_sync(
+        lambda session: MedicationService(session).setup_medication_reminders(medication_id)
+    )
+
+async def _send_dose_confirmation(db: AsyncSession, patient_id: int, medication_name: str):
+    """Queued job: notify the patient that a dose was recorded"""
+    await db.run_sync(
+        lambda session: NotificationService(session).send_dose_confirmation(patient_id, medication_name)
+    )
 
 @router.post("/", response_model=MedicationResponse, status_code=status.HTTP_201_CREATED)
 async def create_medication(
     medication_data: MedicationCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new medication"""
     try:
         # Check permissions
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE]:
+        if current_user.role not in MEDICATION_WRITE_ROLES:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions to create medication"
             )
         
         # Verify patient exists
-        patient = db.query(Patient).filter(Patient.id == medication_data.patient_id).first()
+        patient = await db.get(Patient, medication_data.patient_id)
         if not patient:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Patient not found"
             )
         
-        # Create medication
+        # Create medication from the submitted fields only; omitted ones
+        # fall back to the column defaults, which match the schema defaults
         medication = Medication(
             prescribed_by_id=current_user.id,
-            **medication_data.dict()
+            **medication_data.model_dump(exclude_unset=True)
         )
         
         db.add(medication)
-        db.commit()
-        db.refresh(medication)
-        
-        # Set up medication reminders
-        medication_service = MedicationService(db)
-        background_tasks.add_task(
-            medication_service.setup_medication_reminders,
-            medication.id
-        )
+        await db.commit()
+        await db.refresh(medication)
+        
+        # Set up medication reminders in the background, on the job's own session
+        await enqueue_medication_job(_setup_medication_reminders, medication.id)
         
-        logger.info(f"Medication created: {medication.name} for patient {patient.patient_id}")
-        return MedicationResponse.from_orm(medication)
+        logger.info("Medication created: %s for patient %s", medication.name, patient.patient_id)
+        return _medication_to_response(medication)
         
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        logger.error(f"Create medication error: {e}")
-        db.rollback()
+        logger.error("Create medication error: %s", e)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create medication")
 
 @router.get("/", response_model=MedicationListResponse)
@@ -215,227 +363,230 @@ async def get_medications(
     is_critical: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    cursor: Optional[int] = Query(None, description="Last medication ID seen; enables keyset pagination"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of medications with filtering"""
     try:
-        # Build query
-        query = db.query(Medication)
+        # Collect filters once; they're shared by the page query and the count
+        filters = []
         
         # Apply patient filter based on user role
         if current_user.role == UserRole.PATIENT:
             # Patients can only see their own medications
-            patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
-            if patient:
-                query = query.filter(Medication.patient_id == patient.id)
+            patient_row_id = await db.scalar(
+                select(Patient.id).where(Patient.user_id == current_user.id).limit(1)
+            )
+            if patient_row_id is not None:
+                filters.append(Medication.patient_id == patient_row_id)
             else:
                 return MedicationListResponse(medications=[], total=0, page=page, per_page=per_page, pages=0)
         elif patient_id:
             # Healthcare providers can filter by patient
-            query = query.filter(Medication.patient_id == patient_id)
+            filters.append(Medication.patient_id == patient_id)
         
         # Apply other filters
         if status_filter:
-            query = query.filter(Medication.status == status_filter)
+            filters.append(Medication.status == status_filter)
         
         if is_critical is not None:
-            query = query.filter(Medication.is_critical == is_critical)
+            filters.append(Medication.is_critical == is_critical)
+        
+        query = (
+            select(Medication).options(MEDICATION_LIST_COLUMNS)
+            .where(*filters).order_by(Medication.id)
+        )
         
-        # Get total count
-        total = query.count()
+        if cursor is not None:
+            # Keyset pagination: seek past the last ID seen instead of skipping
+            # rows, so deep pages cost the same as the first; one extra row
+            # tells whether another page follows
+            result = await db.execute(query.where(Medication.id > cursor).limit(per_page + 1))
+            medications = result.scalars().all()
+            
+            content = MEDICATION_LIST_ENCODER.encode({
+                "medications": [_medication_to_list_item(med) for med in medications[:per_page]],
+                "per_page": per_page,
+                "next_cursor": medications[per_page - 1].id if len(medications) > per_page else None
+            })
+            return Response(content=content, media_type="application/json")
         
         # Apply pagination
         offset = (page - 1) * per_page
-        medications = query.offset(offset).limit(per_page).all()
+        result = await db.execute(query.offset(offset).limit(per_page))
+        medications = result.scalars().all()
+        
+        # A short page (or an empty first page) is the last one, so the total is known
+        if len(medications) < per_page and (medications or page == 1):
+            total = offset + len(medications)
+        else:
+            total = await db.scalar(select(func.count(Medication.id)).where(*filters))
         
         pages = (total + per_page - 1) // per_page
         
-        return MedicationListResponse(
-            medications=[MedicationResponse.from_orm(med) for med in medications],
-            total=total,
-            page=page,
-            per_page=per_page,
-            pages=pages
-        )
+        # Encode the page with msgspec; returning a response skips FastAPI
+        # re-validating every item against MedicationListResponse
+        content = MEDICATION_LIST_ENCODER.encode({
+            "medications": [_medication_to_list_item(med) for med in medications],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "next_cursor": medications[-1].id if len(medications) == per_page else None
+        })
+        return Response(content=content, media_type="application/json")
         
     except Exception as e:
-        logger.error(f"Get medications error: {e}")
+        logger.error("Get medications error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve medications")
 
 @router.get("/{medication_id}", response_model=MedicationResponse)
 async def get_medication(
     medication_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get medication by ID"""
     try:
-        # Get medication
-        medication = db.query(Medication).filter(Medication.id == medication_id).first()
-        if not medication:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Medication not found"
-            )
-        
-        # Check permissions
-        if current_user.role == UserRole.PATIENT:
-            patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
-            if not patient or medication.patient_id != patient.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Insufficient permissions to view this medication"
-                )
-        
-        return MedicationResponse.from_orm(medication)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Get medication error: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve medication")
+        cached = await _get_cached_medication(db, medication_id)
+    except RedisError as e:
+        logger.warning("Medication cache unavailable: %s", e)
+        cached = await _load_cached_medication(db, medication_id)
+    
+    _check_medication_owner(current_user, cached.owner_user_id)
+    return Response(content=bytes(cached.medication), media_type="application/json")
 
 @router.put("/{medication_id}", response_model=MedicationResponse)
 async def update_medication(
     medication_id: int,
     medication_data: MedicationUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update medication information"""
     try:
         # Check permissions
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE]:
+        if current_user.role not in MEDICATION_WRITE_ROLES:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions to update medication"
             )
         
-        # Get medication
-        medication = db.query(Medication).filter(Medication.id == medication_id).first()
+        # Update the row in one statement and read it back via RETURNING,
+        # without loading it first or tracking per-attribute changes
+        update_data = medication_data.model_dump(exclude_unset=True)
+        result = await db.execute(
+            update(Medication)
+            .where(Medication.id == medication_id)
+            .values(**update_data, updated_at=func.now())
+            .returning(Medication)
+        )
+        medication = result.scalar_one_or_none()
         if not medication:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Medication not found"
             )
         
-        # Update medication data
-        update_data = medication_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(medication, field, value)
-        
-        medication.updated_at = datetime.now()
-        
-        db.commit()
-        db.refresh(medication)
+        await db.commit()
+        await _invalidate_medication_cache(medication.id)
         
-        logger.info(f"Medication updated: {medication.name} by user {current_user.username}")
-        return MedicationResponse.from_orm(medication)
+        logger.info("Medication updated: %s by user %s", medication.name, current_user.username)
+        return _medication_to_response(medication)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Update medication error: {e}")
-        db.rollback()
+        logger.error("Update medication error: %s", e)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update medication")
 
 @router.post("/{medication_id}/take-dose")
 async def record_dose_taken(
-    medication_id: int,
     dose_data: DoseTakenRequest,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    medication: Medication = Depends(require_medication_access),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Record that a medication dose was taken"""
     try:
-        # Get medication
-        medication = db.query(Medication).filter(Medication.id == medication_id).first()
-        if not medication:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Medication not found"
-            )
-        
-        # Check permissions
-        if current_user.role == UserRole.PATIENT:
-            patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
-            if not patient or medication.patient_id != patient.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Insufficient permissions to record dose for this medication"
-                )
-        
-        # Record dose taken
+        # Record dose taken; the stored adherence score is refreshed here
+        # so the adherence report can read it without recomputing
         medication.record_dose_taken()
+        medication.update_adherence_score()
         
         if dose_data.taken_at:
             medication.last_taken = dose_data.taken_at
         
+        # Dose notes are appended as rows rather than rewriting a growing text column
         if dose_data.notes:
-            current_notes = medication.patient_notes or ""
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-            medication.patient_notes = f"{current_notes}\n[{timestamp}] Dose taken: {dose_data.notes}".strip()
-        
-        db.commit()
-        
-        # Send confirmation notification
-        notification_service = NotificationService(db)
-        background_tasks.add_task(
-            notification_service.send_dose_confirmation,
-            medication.patient_id,
-            medication.name
-        )
+            db.add(MedicationDoseNote(
+                medication_id=medication.id,
+                taken_at=medication.last_taken,
+                note=dose_data.notes
+            ))
+        
+        await db.commit()
+        await _invalidate_medication_cache(medication.id)
         
-        logger.info(f"Dose recorded for medication: {medication.name}")
-        return {"message": "Dose recorded successfully", "next_dose_due": medication.is_time_for_dose()}
+        # Send confirmation notification in the background
+        await enqueue_medication_job(_send_dose_confirmation, medication.patient_id, medication.name)
+        
+        logger.info("Dose recorded for medication: %s", medication.name)
+        return {"message": "Dose recorded successfully", "next_dose_due": medication.is_time_for_dose}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Record dose error: {e}")
-        db.rollback()
+        logger.error("Record dose error: %s", e)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to record dose")
 
+@router.get("/{medication_id}/dose-notes")
+async def get_dose_notes(
+    limit: int = Query(10, ge=1, le=100),
+    medication: Medication = Depends(require_medication_access),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the latest dose notes for a medication"""
+    try:
+        result = await db.execute(
+            select(MedicationDoseNote.taken_at, MedicationDoseNote.note)
+            .where(MedicationDoseNote.medication_id == medication.id)
+            .order_by(MedicationDoseNote.taken_at.desc())
+            .limit(limit)
+        )
+        
+        return {
+            "medication_id": medication.id,
+            "notes": [{"taken_at": row.taken_at, "note": row.note} for row in result]
+        }
+        
+    except Exception as e:
+        logger.error("Get dose notes error: %s", e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve dose notes")
+
 @router.post("/{medication_id}/missed-dose")
 async def record_missed_dose(
-    medication_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    medication: Medication = Depends(require_medication_access),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Record a missed medication dose"""
     try:
-        # Get medication
-        medication = db.query(Medication).filter(Medication.id == medication_id).first()
-        if not medication:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Medication not found"
-            )
-        
-        # Check permissions
-        if current_user.role == UserRole.PATIENT:
-            patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
-            if not patient or medication.patient_id != patient.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Insufficient permissions to record missed dose for this medication"
-                )
-        
         # Record missed dose
         medication.record_missed_dose()
         
-        db.commit()
+        await db.commit()
+        await _invalidate_medication_cache(medication.id)
         
-        logger.info(f"Missed dose recorded for medication: {medication.name}")
+        logger.info("Missed dose recorded for medication: %s", medication.name)
         return {"message": "Missed dose recorded", "adherence_score": medication.adherence_score}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Record missed dose error: {e}")
-        db.rollback()
+        logger.error("Record missed dose error: %s", e)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to record missed dose")
 
 @router.post("/{medication_id}/refill")
@@ -443,19 +594,19 @@ async def add_refill(
     medication_id: int,
     refill_data: RefillRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add refill to medication"""
     try:
         # Check permissions
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE]:
+        if current_user.role not in MEDICATION_WRITE_ROLES:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions to add refill"
             )
         
         # Get medication
-        medication = db.query(Medication).filter(Medication.id == medication_id).first()
+        medication = await db.get(Medication, medication_id)
         if not medication:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -468,9 +619,10 @@ async def add_refill(
         if refill_data.pharmacy_notes:
             medication.pharmacy_notes = refill_data.pharmacy_notes
         
-        db.commit()
+        await db.commit()
+        await _invalidate_medication_cache(medication.id)
         
-        logger.info(f"Refill added for medication: {medication.name}")
+        logger.info("Refill added for medication: %s", medication.name)
         return {
             "message": "Refill added successfully",
             "quantity_remaining": medication.quantity_remaining,
@@ -481,8 +633,8 @@ async def add_refill(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Add refill error: {e}")
-        db.rollback()
+        logger.error("Add refill error: %s", e)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to add refill")
 
 @router.post("/{medication_id}/discontinue")
@@ -490,19 +642,19 @@ async def discontinue_medication(
     medication_id: int,
     reason: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Discontinue medication"""
     try:
         # Check permissions
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE]:
+        if current_user.role not in MEDICATION_WRITE_ROLES:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions to discontinue medication"
             )
         
         # Get medication
-        medication = db.query(Medication).filter(Medication.id == medication_id).first()
+        medication = await db.get(Medication, medication_id)
         if not medication:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -512,49 +664,57 @@ async def discontinue_medication(
         # Discontinue medication
         medication.discontinue(reason)
         
-        db.commit()
+        await db.commit()
+        await _invalidate_medication_cache(medication.id)
         
-        logger.info(f"Medication discontinued: {medication.name} by user {current_user.username}")
+        logger.info("Medication discontinued: %s by user %s", medication.name, current_user.username)
         return {"message": "Medication discontinued successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Discontinue medication error: {e}")
-        db.rollback()
+        logger.error("Discontinue medication error: %s", e)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to discontinue medication")
 
 @router.get("/{medication_id}/interactions")
 async def check_drug_interactions(
     medication_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check drug interactions for medication"""
     try:
-        # Get medication
-        medication = db.query(Medication).filter(Medication.id == medication_id).first()
-        if not medication:
+        # Load the medication and the patient's other active medications,
+        # with the owner's user ID, in one query
+        target = aliased(Medication)
+        result = await db.execute(
+            select(Medication, Patient.user_id)
+            .join(Patient, Patient.id == Medication.patient_id)
+            .where(
+                Medication.patient_id == select(target.patient_id).where(
+                    target.id == medication_id
+                ).scalar_subquery(),
+                or_(Medication.id == medication_id, Medication.status == MedicationStatus.ACTIVE)
+            )
+        )
+        rows = result.all()
+        
+        medication = next((med for med, _ in rows if med.id == medication_id), None)
+        if medication is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Medication not found"
             )
         
-        # Check permissions
-        if current_user.role == UserRole.PATIENT:
-            patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
-            if not patient or medication.patient_id != patient.id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Insufficient permissions to view interactions for this medication"
-                )
+        owner_user_id = rows[0][1]
+        if current_user.role == UserRole.PATIENT and owner_user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions to view interactions for this medication"
+            )
         
-        # Get other medications for the patient
-        other_medications = db.query(Medication).filter(
-            Medication.patient_id == medication.patient_id,
-            Medication.id != medication.id,
-            Medication.status == MedicationStatus.ACTIVE
-        ).all()
+        other_medications = [med for med, _ in rows if med.id != medication_id]
         
         # Check interactions
         interactions = medication.check_drug_interactions(other_medications)
@@ -568,57 +728,68 @@ async def check_drug_interactions(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Check interactions error: {e}")
+        logger.error("Check interactions error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to check interactions")
 
 @router.get("/patient/{patient_id}/adherence")
 async def get_medication_adherence(
     patient_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get medication adherence report for patient"""
     try:
         # Check permissions
         if current_user.role == UserRole.PATIENT:
-            patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
-            if not patient or patient.id != patient_id:
+            owns_patient = await db.scalar(
+                select(exists().where(Patient.id == patient_id, Patient.user_id == current_user.id))
+            )
+            if not owns_patient:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Insufficient permissions to view adherence for this patient"
                 )
         
-        # Get patient medications
-        medications = db.query(Medication).filter(
-            Medication.patient_id == patient_id,
-            Medication.status == MedicationStatus.ACTIVE
-        ).all()
-        
-        adherence_data = []
-        total_adherence = 0
-        
-        for medication in medications:
-            medication.update_adherence_score()
-            adherence_data.append({
-                "medication_id": medication.id,
-                "medication_name": medication.name,
-                "adherence_score": medication.adherence_score or 0,
-                "missed_doses": medication.missed_doses,
-                "is_critical": medication.is_critical
-            })
-            total_adherence += (medication.adherence_score or 0)
+        # Scores are kept current by the dose endpoints; read the stored
+        # columns as plain rows with the average computed by the database
+        adherence_score = func.coalesce(Medication.adherence_score, 0)
+        result = await db.execute(
+            select(
+                Medication.id,
+                Medication.name,
+                adherence_score.label("adherence_score"),
+                Medication.missed_doses,
+                Medication.is_critical,
+                func.avg(adherence_score).over().label("average_adherence")
+            ).where(
+                Medication.patient_id == patient_id,
+                Medication.status == MedicationStatus.ACTIVE
+            )
+        )
+        rows = result.all()
+        
+        adherence_data = [
+            {
+                "medication_id": row.id,
+                "medication_name": row.name,
+                "adherence_score": row.adherence_score,
+                "missed_doses": row.missed_doses,
+                "is_critical": row.is_critical
+            }
+            for row in rows
+        ]
         
-        average_adherence = total_adherence / len(medications) if medications else 0
+        average_adherence = rows[0].average_adherence if rows else 0
         
         return {
             "patient_id": patient_id,
             "average_adherence": round(average_adherence, 2),
-            "total_medications": len(medications),
+            "total_medications": len(rows),
             "medications": adherence_data
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Get adherence error: {e}")
+        logger.error("Get adherence error: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to get adherence data")
\ No newline at end of file
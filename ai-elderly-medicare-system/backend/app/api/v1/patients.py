@@ -3,25 +3,29 @@ Patient management API endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import exists, func, insert, lambda_stmt, literal_column, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
 from datetime import datetime, date
 import logging
 
-from app.database import get_db
+from app.database import get_async_db
+from app.deps import get_current_user
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.health_record import HealthRecord
+from app.models.medication import Medication, MedicationStatus
 from app.models.patient import Patient, Gender, BloodType
 from app.models.user import User, UserRole
-from app.security import verify_token
-from app.services.auth_service import AuthService
 from app.utils.exceptions import ValidationError, PermissionError
 
 router = APIRouter()
-security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
 # Pydantic models
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 class PatientCreate(BaseModel):
     user_id: int
@@ -42,19 +46,22 @@ class PatientCreate(BaseModel):
     care_plan: Optional[str] = None
     special_needs: Optional[str] = None
     
-    @validator('date_of_birth')
+    @field_validator('date_of_birth')
+    @classmethod
     def validate_birth_date(cls, v):
         if v > date.today():
             raise ValueError('Birth date cannot be in the future')
         return v
     
-    @validator('height')
+    @field_validator('height')
+    @classmethod
     def validate_height(cls, v):
         if v is not None and (v < 50 or v > 250):
             raise ValueError('Height must be between 50-250 cm')
         return v
     
-    @validator('weight')
+    @field_validator('weight')
+    @classmethod
     def validate_weight(cls, v):
         if v is not None and (v < 20 or v > 300):
             raise ValueError('Weight must be between 20-300 kg')
@@ -107,11 +114,11 @@ class PatientResponse(BaseModel):
     updated_at: Optional[datetime]
     last_visit: Optional[datetime]
     
-    # Computed fields
-    age: Optional[int]
-    bmi: Optional[float]
-    is_elderly: Optional[bool]
-    full_address: Optional[str]
+    # Derived values; Patient hybrids, computed by the database in list queries
+    age: Optional[int] = None
+    bmi: Optional[float] = None
+    is_elderly: Optional[bool] = None
+    full_address: Optional[str] = None
     
     # User information
     first_name: str
@@ -119,37 +126,111 @@ class PatientResponse(BaseModel):
     email: str
     phone_number: Optional[str]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
-class PatientListResponse(BaseModel):
-    patients: List[PatientResponse]
-    total: int
-    page: int
-    per_page: int
-    pages: int
+# PatientResponse fields taken from the patient's user; the rest come from the patient row
+USER_RESPONSE_FIELDS = ("first_name", "last_name", "email", "phone_number")
+PATIENT_RESPONSE_FIELDS = tuple(
+    field for field in PatientResponse.model_fields if field not in USER_RESPONSE_FIELDS
+)
+
+# Patient response columns, labelled so the derived hybrids come back
+# under their field names
+PATIENT_RESPONSE_COLUMNS = tuple(
+    getattr(Patient, field).label(field) for field in PATIENT_RESPONSE_FIELDS
+)
+
+# Flat column list for the patient list query
+PATIENT_LIST_COLUMNS = (
+    *PATIENT_RESPONSE_COLUMNS,
+    *(getattr(User, field) for field in USER_RESPONSE_FIELDS),
+)
+
+# Search haystacks; these render exactly like the pg_trgm GIN index
+# expressions from migration 008, so ILIKE '%term%' can use those indexes
+_BLANK = literal_column("''")
+PATIENT_NAME_SEARCH = (
+    func.coalesce(User.first_name, _BLANK) + literal_column("' '") + func.coalesce(User.last_name, _BLANK)
+)
+PATIENT_IDS_SEARCH = (
+    Patient.patient_id + literal_column("' '") + func.coalesce(Patient.medical_record_number, _BLANK)
+)
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    """Get current authenticated user"""
-    payload = verify_token(credentials.credentials)
-    user_id = payload.get("sub")
+def _filter_patients(stmt, search: Optional[str], risk_level: Optional[str], is_active: Optional[bool]):
+    """Add the list endpoint's filters to a patients-join-users lambda statement"""
+    if search:
+        # Each side is an IN over a single indexed table so the planner
+        # can use both trigram indexes instead of filtering the join
+        search_term = f"%{search}%"
+        stmt += lambda s: s.where(
+            Patient.user_id.in_(
+                select(User.id).where(PATIENT_NAME_SEARCH.ilike(search_term)).correlate(None)
+            ) |
+            Patient.id.in_(
+                select(Patient.id).where(PATIENT_IDS_SEARCH.ilike(search_term)).correlate(None)
+            )
+        )
     
-    if user_id is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if risk_level:
+        stmt += lambda s: s.where(Patient.risk_level == risk_level)
     
-    auth_service = AuthService(db)
-    user = auth_service.get_user_by_id(int(user_id))
+    if is_active is not None:
+        stmt += lambda s: s.where(Patient.is_active_patient == is_active)
     
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return stmt
+
+def _patient_to_response(patient: Patient, user: User) -> PatientResponse:
+    """Build a PatientResponse from a patient row and its user"""
+    data = {field: getattr(patient, field) for field in PATIENT_RESPONSE_FIELDS}
+    data.update({field: getattr(user, field) for field in USER_RESPONSE_FIELDS})
+    return PatientResponse.model_validate(data)
+
+class PatientListResponse(BaseModel):
+    patients: List[PatientResponse]
+    total: Optional[int] = None  # not computed for cursor requests
+    page: Optional[int] = None
+    per_page: int
+    pages: Optional[int] = None
+    next_cursor: Optional[int] = None  # pass as ?cursor= to fetch the following page
+
+class PatientBulkCreate(BaseModel):
+    patients: List[PatientCreate] = Field(..., min_length=1, max_length=10000)
+
+class PatientBulkCreated(BaseModel):
+    id: int
+    patient_id: str
+    user_id: int
+
+class PatientBulkCreateResponse(BaseModel):
+    created: List[PatientBulkCreated]
+
+async def _patient_integrity_error(exc: IntegrityError, user_id: int, db: AsyncSession) -> HTTPException:
+    """Map a failed patient INSERT to the HTTP error the client should see"""
+    # psycopg reports the constraint name; other drivers only the message
+    diag = getattr(exc.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None) or str(exc.orig)
+    if "ix_patients_user_id" in constraint or "patients.user_id" in constraint:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Patient profile already exists for this user"
+        )
     
-    return user
+    # Some drivers do not name the failed foreign key; check the user directly
+    if not await db.scalar(select(exists().where(User.id == user_id))):
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Patient data conflicts with an existing record"
+    )
 
 @router.post("/", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
 async def create_patient(
     patient_data: PatientCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new patient"""
     try:
@@ -160,53 +241,110 @@ async def create_patient(
                 detail="Insufficient permissions to create patient"
             )
         
-        # Verify user exists
-        user = db.query(User).filter(User.id == patient_data.user_id).first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        # Check if patient already exists for this user
-        existing_patient = db.query(Patient).filter(Patient.user_id == patient_data.user_id).first()
-        if existing_patient:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Patient profile already exists for this user"
-            )
-        
         # Generate patient ID
         from app.security import generate_patient_id
         patient_id = generate_patient_id()
         
-        # Create patient
+        # Create patient; the users FK and the unique user_id index reject
+        # unknown users and duplicate profiles, so nothing is checked up front
         patient = Patient(
             patient_id=patient_id,
-            **patient_data.dict()
+            **patient_data.model_dump()
         )
         
-        db.add(patient)
-        db.commit()
-        db.refresh(patient)
+        try:
+            db.add(patient)
+            await db.flush()
+            new_id = patient.id
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            raise await _patient_integrity_error(e, patient_data.user_id, db)
+        
+        # Read the row back with its user in one query
+        patient = (await db.execute(
+            select(Patient).options(joinedload(Patient.user)).where(Patient.id == new_id)
+        )).scalar_one()
         
         # Prepare response with user data
-        response_data = PatientResponse.from_orm(patient)
-        response_data.first_name = user.first_name
-        response_data.last_name = user.last_name
-        response_data.email = user.email
-        response_data.phone_number = user.phone_number
+        response_data = _patient_to_response(patient, patient.user)
         
         logger.info(f"Patient created: {patient.patient_id} by user {current_user.username}")
         return response_data
         
+    except HTTPException:
+        raise
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Create patient error: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create patient")
 
+@router.post("/bulk", response_model=PatientBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_patients_bulk(
+    bulk_data: PatientBulkCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many patients in one transaction; the whole batch fails if any row is invalid"""
+    try:
+        # Check permissions
+        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions to create patient"
+            )
+        
+        user_ids = [row.user_id for row in bulk_data.patients]
+        if len(set(user_ids)) != len(user_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Each user may appear only once per batch"
+            )
+        
+        # One query each for missing users and existing patient profiles
+        found_user_ids = set(await db.scalars(select(User.id).where(User.id.in_(user_ids))))
+        missing = sorted(set(user_ids) - found_user_ids)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Users not found: {missing}"
+            )
+        
+        existing = sorted(await db.scalars(select(Patient.user_id).where(Patient.user_id.in_(user_ids))))
+        if existing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Patient profile already exists for users: {existing}"
+            )
+        
+        # Single executemany INSERT; SQLAlchemy batches it into multi-row
+        # INSERT ... RETURNING statements (insertmanyvalues)
+        from app.security import generate_patient_id
+        rows = [
+            {**row.model_dump(), "patient_id": generate_patient_id()}
+            for row in bulk_data.patients
+        ]
+        created = (await db.execute(
+            insert(Patient).returning(Patient.id, Patient.patient_id, Patient.user_id),
+            rows
+        )).all()
+        
+        await db.commit()
+        
+        logger.info(f"{len(created)} patients created in bulk by user {current_user.username}")
+        return PatientBulkCreateResponse(
+            created=[PatientBulkCreated.model_validate(row, from_attributes=True) for row in created]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk create patients error: {e}")
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create patients")
+
 @router.get("/", response_model=PatientListResponse)
 async def get_patients(
     page: int = Query(1, ge=1),
@@ -214,8 +352,9 @@ async def get_patients(
     search: Optional[str] = Query(None),
     risk_level: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
+    cursor: Optional[int] = Query(None, description="Last patient ID seen; enables keyset pagination"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of patients with pagination and filtering"""
     try:
@@ -226,52 +365,56 @@ async def get_patients(
                 detail="Insufficient permissions to view patients"
             )
         
-        # Build query
-        query = db.query(Patient).join(User, Patient.user_id == User.id)
-        
-        # Apply filters
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                (User.first_name.ilike(search_term)) |
-                (User.last_name.ilike(search_term)) |
-                (Patient.patient_id.ilike(search_term)) |
-                (Patient.medical_record_number.ilike(search_term))
-            )
-        
-        if risk_level:
-            query = query.filter(Patient.risk_level == risk_level)
-        
-        if is_active is not None:
-            query = query.filter(Patient.is_active_patient == is_active)
-        
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination
-        offset = (page - 1) * per_page
-        patients = query.offset(offset).limit(per_page).all()
-        
-        # Prepare response data
-        patient_responses = []
-        for patient in patients:
-            response_data = PatientResponse.from_orm(patient)
-            response_data.first_name = patient.user.first_name
-            response_data.last_name = patient.user.last_name
-            response_data.email = patient.user.email
-            response_data.phone_number = patient.user.phone_number
-            patient_responses.append(response_data)
-        
-        pages = (total + per_page - 1) // per_page
-        
-        return PatientListResponse(
-            patients=patient_responses,
-            total=total,
-            page=page,
-            per_page=per_page,
-            pages=pages
+        # Build query; select just the response columns of patients and
+        # their users as plain rows instead of hydrating ORM instances.
+        # Lambda statements are compiled once per filter combination and
+        # reused with new parameters afterwards
+        query = _filter_patients(
+            lambda_stmt(lambda: select(*PATIENT_LIST_COLUMNS).join(User, Patient.user_id == User.id).order_by(Patient.id)),
+            search, risk_level, is_active
         )
         
+        if cursor is not None:
+            # Keyset pagination: seek past the last ID seen instead of skipping
+            # rows; one extra row tells whether another page follows
+            limit = per_page + 1
+            query += lambda s: s.where(Patient.id > cursor).limit(limit)
+            patients = (await db.execute(query)).all()
+            next_cursor = patients[per_page - 1].id if len(patients) > per_page else None
+            patients = patients[:per_page]
+            total = pages = page = None
+        else:
+            # Apply pagination; the window count returns the total with the
+            # page rows instead of running the filtered join a second time
+            offset = (page - 1) * per_page
+            query += lambda s: s.add_columns(func.count().over().label("total")).offset(offset).limit(per_page)
+            patients = (await db.execute(query)).all()
+            
+            if patients:
+                total = patients[0].total
+            else:
+                # Past the last page the window has no rows to report on
+                total = await db.scalar(_filter_patients(
+                    lambda_stmt(lambda: select(func.count(Patient.id)).join(User, Patient.user_id == User.id)),
+                    search, risk_level, is_active
+                )) if page > 1 else 0
+            
+            pages = (total + per_page - 1) // per_page
+            next_cursor = patients[-1].id if len(patients) == per_page else None
+        
+        # Prepare response data; orjson encodes the dates and enums natively,
+        # so skip FastAPI's jsonable_encoder pass and drop unset patient fields
+        return ORJSONResponse({
+            "patients": [
+                PatientResponse.model_validate(row).model_dump(exclude_none=True) for row in patients
+            ],
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "next_cursor": next_cursor
+        })
+        
     except Exception as e:
         logger.error(f"Get patients error: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve patients")
@@ -280,12 +423,14 @@ async def get_patients(
 async def get_patient(
     patient_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get patient by ID"""
     try:
-        # Get patient
-        patient = db.query(Patient).filter(Patient.id == patient_id).first()
+        # Get patient with its user in one query
+        patient = (await db.execute(
+            select(Patient).options(joinedload(Patient.user)).where(Patient.id == patient_id)
+        )).scalar_one_or_none()
         if not patient:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -300,11 +445,7 @@ async def get_patient(
             )
         
         # Prepare response with user data
-        response_data = PatientResponse.from_orm(patient)
-        response_data.first_name = patient.user.first_name
-        response_data.last_name = patient.user.last_name
-        response_data.email = patient.user.email
-        response_data.phone_number = patient.user.phone_number
+        response_data = _patient_to_response(patient, patient.user)
         
         return response_data
         
@@ -319,42 +460,43 @@ async def update_patient(
     patient_id: int,
     patient_data: PatientUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update patient information"""
     try:
-        # Get patient
-        patient = db.query(Patient).filter(Patient.id == patient_id).first()
-        if not patient:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Patient not found"
-            )
-        
-        # Check permissions
-        if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE]:
-            if current_user.role == UserRole.PATIENT and patient.user_id != current_user.id:
+        # Update in one statement and read the row back via RETURNING;
+        # patients may only update their own record, checked in the WHERE
+        stmt = update(Patient).where(Patient.id == patient_id)
+        if current_user.role == UserRole.PATIENT:
+            stmt = stmt.where(Patient.user_id == current_user.id)
+        
+        # RETURNING the response columns as a plain row skips hydrating and
+        # synchronizing a Patient instance in the session
+        update_data = patient_data.model_dump(exclude_unset=True)
+        patient = (await db.execute(
+            stmt.values(**update_data, updated_at=func.now())
+            .returning(*PATIENT_RESPONSE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )).first()
+        
+        if patient is None:
+            # Nothing matched; tell a missing patient from someone else's record
+            if not await db.scalar(select(exists().where(Patient.id == patient_id))):
                 raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Insufficient permissions to update this patient"
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Patient not found"
                 )
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions to update this patient"
+            )
         
-        # Update patient data
-        update_data = patient_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(patient, field, value)
-        
-        patient.updated_at = datetime.now()
-        
-        db.commit()
-        db.refresh(patient)
+        await db.commit()
         
-        # Prepare response with user data
-        response_data = PatientResponse.from_orm(patient)
-        response_data.first_name = patient.user.first_name
-        response_data.last_name = patient.user.last_name
-        response_data.email = patient.user.email
-        response_data.phone_number = patient.user.phone_number
+        # Prepare response with user data; no lazy loads on an AsyncSession,
+        # and the identity map usually has the user already
+        user = await db.get(User, patient.user_id)
+        response_data = _patient_to_response(patient, user)
         
         logger.info(f"Patient updated: {patient.patient_id} by user {current_user.username}")
         return response_data
@@ -363,14 +505,14 @@ async def update_patient(
         raise
     except Exception as e:
         logger.error(f"Update patient error: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update patient")
 
 @router.delete("/{patient_id}")
 async def delete_patient(
     patient_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete patient (soft delete by deactivating)"""
     try:
@@ -381,41 +523,65 @@ async def delete_patient(
                 detail="Insufficient permissions to delete patient"
             )
         
-        # Get patient
-        patient = db.query(Patient).filter(Patient.id == patient_id).first()
-        if not patient:
+        # Soft delete by deactivating, in one statement
+        deactivated_id = (await db.execute(
+            update(Patient)
+            .where(Patient.id == patient_id)
+            .values(is_active_patient=False, updated_at=func.now())
+            .returning(Patient.patient_id)
+        )).scalar_one_or_none()
+        if deactivated_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Patient not found"
             )
         
-        # Soft delete by deactivating
-        patient.is_active_patient = False
-        patient.updated_at = datetime.now()
-        
-        db.commit()
+        await db.commit()
         
-        logger.info(f"Patient deactivated: {patient.patient_id} by user {current_user.username}")
+        logger.info(f"Patient deactivated: {deactivated_id} by user {current_user.username}")
         return {"message": "Patient deactivated successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Delete patient error: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete patient")
 
 @router.get("/{patient_id}/summary")
 async def get_patient_summary(
     patient_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get patient summary with health metrics"""
     try:
-        # Get patient
-        patient = db.query(Patient).filter(Patient.id == patient_id).first()
-        if not patient:
+        # Count active medications and upcoming appointments in SQL instead of
+        # loading both collections
+        active_medications = (
+            select(func.count(Medication.id))
+            .where(Medication.patient_id == patient_id, Medication.status == MedicationStatus.ACTIVE)
+            .scalar_subquery()
+        )
+        upcoming_appointments = (
+            select(func.count(Appointment.id))
+            .where(
+                Appointment.patient_id == patient_id,
+                Appointment.appointment_date > func.now(),
+                Appointment.status != AppointmentStatus.CANCELLED
+            )
+            .scalar_subquery()
+        )
+        
+        # Get patient, the users shown in the summary and both counts in one query
+        row = (await db.execute(
+            select(Patient, active_medications, upcoming_appointments).options(
+                joinedload(Patient.user),
+                joinedload(Patient.primary_physician),
+                joinedload(Patient.assigned_caregiver)
+            ).where(Patient.id == patient_id)
+        )).first()
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Patient not found"
@@ -428,14 +594,15 @@ async def get_patient_summary(
                 detail="Insufficient permissions to view this patient"
             )
         
-        # Get latest health record
-        latest_health_record = patient.get_latest_health_record()
-        
-        # Get current medications
-        current_medications = patient.get_current_medications()
+        patient, active_medication_count, upcoming_appointment_count = row
         
-        # Get upcoming appointments
-        upcoming_appointments = patient.get_upcoming_appointments()
+        # Get latest health record without loading the patient's full history
+        latest_health_record = await db.scalar(
+            select(HealthRecord)
+            .where(HealthRecord.patient_id == patient_id)
+            .order_by(HealthRecord.recorded_at.desc())
+            .limit(1)
+        )
         
         summary = {
             "patient_info": {
@@ -452,8 +619,8 @@ async def get_patient_summary(
                 "health_score": latest_health_record.calculate_health_score() if latest_health_record else None
             },
             "care_summary": {
-                "active_medications": len(current_medications),
-                "upcoming_appointments": len(upcoming_appointments),
+                "active_medications": active_medication_count,
+                "upcoming_appointments": upcoming_appointment_count,
                 "primary_physician": patient.primary_physician.full_name if patient.primary_physician else None,
                 "assigned_caregiver": patient.assigned_caregiver.full_name if patient.assigned_caregiver else None
             },
@@ -480,7 +647,7 @@ async def assign_caregiver(
     patient_id: int,
     caregiver_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Assign caregiver to patient"""
     try:
@@ -491,37 +658,37 @@ async def assign_caregiver(
                 detail="Insufficient permissions to assign caregiver"
             )
         
-        # Get patient
-        patient = db.query(Patient).filter(Patient.id == patient_id).first()
-        if not patient:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Patient not found"
+        # Assign in one statement; the caregiver check rides along as EXISTS
+        assigned_id = (await db.execute(
+            update(Patient)
+            .where(
+                Patient.id == patient_id,
+                exists().where(User.id == caregiver_id, User.role == UserRole.CAREGIVER)
             )
+            .values(assigned_caregiver_id=caregiver_id, updated_at=func.now())
+            .returning(Patient.patient_id)
+        )).scalar_one_or_none()
         
-        # Verify caregiver exists
-        caregiver = db.query(User).filter(
-            User.id == caregiver_id,
-            User.role == UserRole.CAREGIVER
-        ).first()
-        if not caregiver:
+        if assigned_id is None:
+            # Nothing matched; find out which side was missing
+            if not await db.scalar(select(exists().where(Patient.id == patient_id))):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Patient not found"
+                )
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Caregiver not found"
             )
         
-        # Assign caregiver
-        patient.assigned_caregiver_id = caregiver_id
-        patient.updated_at = datetime.now()
-        
-        db.commit()
+        await db.commit()
         
-        logger.info(f"Caregiver {caregiver_id} assigned to patient {patient.patient_id}")
+        logger.info(f"Caregiver {caregiver_id} assigned to patient {assigned_id}")
         return {"message": "Caregiver assigned successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Assign caregiver error: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to assign caregiver")
\ No newline at end of file
@@ -1,18 +1,108 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2.exceptions import InvalidHashError, VerificationError
 from ..models import User, db
+from ..security import password_hasher
 from ..forms import LoginForm, RegistrationForm, ForgotPasswordForm, ResetPasswordForm
-from ..utils import send_email, generate_token, verify_token
+from ..utils import send_email, send_email_async, generate_token, verify_token
 from datetime import datetime, timedelta
 import logging
+import redis
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+# Verified against when the email is unknown, so those logins cost the same
+# argon2 work as real ones and response time doesn't reveal which emails exist
+DUMMY_PASSWORD_HASH = password_hasher.hash('unused-but-valid')
+
+def check_dummy_password(password):
+    """Spend a real password verification's worth of work; always fails"""
+    try:
+        password_hasher.verify(DUMMY_PASSWORD_HASH, password)
+    except VerificationError:
+        pass
+    return False
+
+def check_user_password(user, password):
+    """
+    Verify a user's password with argon2id; legacy werkzeug (pbkdf2) hashes
+    and outdated argon2 parameters are rehashed on a successful login
+    """
+    if user.password.startswith('$argon2'):
+        try:
+            password_hasher.verify(user.password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if not password_hasher.check_needs_rehash(user.password):
+            return True
+    elif not check_password_hash(user.password, password):
+        return False
+    
+    user.password = password_hasher.hash(password)
+    db.session.commit()
+    return True
+
+# Endpoints whose POSTs are rate limited before any user lookup or hashing
+RATE_LIMITED_ENDPOINTS = frozenset({'auth.login', 'auth.forgot_password'})
+
+# Redis client for the auth rate limiter, created on first use
+_rate_limit_store = None
+
+def get_rate_limit_store():
+    global _rate_limit_store
+    if _rate_limit_store is None:
+        _rate_limit_store = redis.Redis.from_url(current_app.config['RATELIMIT_STORAGE_URI'])
+    return _rate_limit_store
+
+def rate_limit_retry_after(*keys):
+    """
+    Count a hit against each key in a fixed window; return the seconds to wait
+    if any key is over the limit, else 0
+    """
+    limit = current_app.config['AUTH_RATE_LIMIT']
+    window = current_app.config['AUTH_RATE_LIMIT_WINDOW']
+    
+    pipe = get_rate_limit_store().pipeline(transaction=False)
+    for key in keys:
+        # SET NX starts the window; INCR keeps the TTL it set
+        pipe.set(key, 0, ex=window, nx=True)
+        pipe.incr(key)
+        pipe.ttl(key)
+    results = pipe.execute()
+    
+    retry_after = 0
+    for count, ttl in zip(results[1::3], results[2::3]):
+        if count > limit:
+            retry_after = max(retry_after, ttl if ttl > 0 else window)
+    return retry_after
+
 def create_auth_blueprint():
     auth = Blueprint('auth', __name__)
 
+    @auth.before_request
+    def limit_auth_attempts():
+        """Shed repeated login/reset POSTs per IP and per email with one Redis round trip"""
+        if request.method != 'POST' or request.endpoint not in RATE_LIMITED_ENDPOINTS:
+            return None
+        
+        keys = [f'ratelimit:{request.endpoint}:ip:{request.remote_addr}']
+        email = request.form.get('email', '').strip().lower()
+        if email:
+            keys.append(f'ratelimit:{request.endpoint}:email:{email}')
+        
+        try:
+            retry_after = rate_limit_retry_after(*keys)
+        except redis.RedisError as e:
+            # Fail open; the limiter must not take logins down with it
+            logger.warning(f"Auth rate limiter unavailable: {str(e)}")
+            return None
+        
+        if retry_after:
+            return 'Too many attempts. Please try again later.', 429, {'Retry-After': str(retry_after)}
+        return None
+
     @auth.route('/login', methods=['GET', 'POST'])
     def login():
         if current_user.is_authenticated:
@@ -21,7 +111,12 @@ def create_auth_blueprint():
         form = LoginForm()
         if form.validate_on_submit():
             user = User.query.filter_by(email=form.email.data).first()
-            if user and check_password_hash(user.password, form.password.data):
+            if user is not None:
+                password_ok = check_user_password(user, form.password.data)
+            else:
+                password_ok = check_dummy_password(form.password.data)
+            
+            if password_ok:
                 if not user.is_active:
                     flash('Your account is inactive. Please contact support.', 'warning')
                     return redirect(url_for('auth.login'))
@@ -48,7 +143,7 @@ def create_auth_blueprint():
         form = RegistrationForm()
         if form.validate_on_submit():
             try:
-                hashed_password = generate_password_hash(form.password.data)
+                hashed_password = password_hasher.hash(form.password.data)
                 user = User(
                     email=form.email.data,
                     password=hashed_password,
@@ -62,11 +157,12 @@ def create_auth_blueprint():
                 db.session.add(user)
                 db.session.commit()
                 
-                # Send welcome/verification email
+                # Send welcome/verification email; the SMTP round trip happens
+                # in the background so the redirect doesn't wait on it
                 try:
                     token = generate_token(user.email)
                     verify_url = url_for('auth.verify_email', token=token, _external=True)
-                    send_email(
+                    send_email_async(
                         subject='Welcome to AI Elderly Medicare',
                         recipients=[user.email],
                         template='email/welcome.html',
@@ -122,6 +218,8 @@ def create_auth_blueprint():
                     logger.error(f"Error sending password reset email: {str(e)}")
                     flash('An error occurred while sending the reset email. Please try again.', 'danger')
             else:
+                # Do the token work anyway so unknown emails aren't answered faster
+                generate_token(form.email.data, expires_in=3600)
                 flash('If an account exists with this email, you will receive a password reset link.', 'info')
                 return redirect(url_for('auth.login'))
                 
@@ -146,7 +244,7 @@ def create_auth_blueprint():
         form = ResetPasswordForm()
         if form.validate_on_submit():
             try:
-                user.password = generate_password_hash(form.password.data)
+                user.password = password_hasher.hash(form.password.data)
                 db.session.commit()
                 flash('Your password has been updated successfully!', 'success')
                 return redirect(url_for('auth.login'))
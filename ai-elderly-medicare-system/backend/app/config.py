@@ -3,6 +3,7 @@ Configuration settings for AI Elderly Medicare System
 """
 
 import os
+from functools import lru_cache
 from typing import List
 from pydantic_settings import BaseSettings
 from pydantic import validator
@@ -20,13 +21,23 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = "sqlite:///./elderly_medicare.db"
     DATABASE_ECHO: bool = False
+    # Compiled-statement cache per engine; sized for every list filter combination
+    DATABASE_QUERY_CACHE_SIZE: int = 1200
     
     # Security settings
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
+    JWT_PRIVATE_KEY: str = ""  # PEM; only used with RS*/ES* algorithms
+    JWT_PUBLIC_KEY: str = ""   # PEM; only used with RS*/ES* algorithms
+    JWT_LEEWAY_SECONDS: int = 30
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Password hashing (argon2id); tune so one hash takes ~250ms on the target host
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 19456  # KiB
+    ARGON2_PARALLELISM: int = 1
+    
     # CORS settings
     ALLOWED_HOSTS: List[str] = ["*"]
     
@@ -44,6 +55,15 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     EMAIL_USERNAME: str = ""
     EMAIL_PASSWORD: str = ""
+    EMAIL_SEND_RATE: float = 14.0  # max emails per second across all server processes
+    EMAIL_WORKERS: int = 4  # queue workers per process
+    EMAIL_QUEUE_SIZE: int = 1000
+    EMAIL_DRAIN_TIMEOUT: float = 20.0  # seconds to finish queued emails on shutdown
+    # Server processes; uvicorn reads the same variable as its --workers default
+    WEB_CONCURRENCY: int = 1
+    
+    # Medication background jobs
+    MEDICATION_JOB_QUEUE_SIZE: int = 1000
     
     # File upload settings
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
@@ -52,6 +72,7 @@ class Settings(BaseSettings):
     
     # Redis settings (for caching)
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # seconds; bounds Redis calls made on request paths
     CACHE_EXPIRE_SECONDS: int = 3600
     
     # Monitoring settings
@@ -72,16 +93,24 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
-# Create settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build the settings on first use; later calls return the same instance"""
+    return Settings()
 
-# Database configuration
-DATABASE_CONFIG = {
-    "url": settings.DATABASE_URL,
-    "echo": settings.DATABASE_ECHO,
-    "pool_pre_ping": True,
-    "pool_recycle": 300,
-}
+def __getattr__(name):
+    """Resolve settings-derived names lazily, e.g. ``from app.config import settings``"""
+    if name == "settings":
+        return get_settings()
+    if name == "DATABASE_CONFIG":
+        settings = get_settings()
+        return {
+            "url": settings.DATABASE_URL,
+            "echo": settings.DATABASE_ECHO,
+            "pool_pre_ping": True,
+            "pool_recycle": 300,
+        }
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # AI Model configurations
 AI_MODELS = {
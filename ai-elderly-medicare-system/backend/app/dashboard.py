@@ -1,161 +1,206 @@
 from flask import Blueprint, render_template, jsonify, request, current_app
 from flask_login import login_required, current_user
-from datetime import datetime, timedelta
-from ..models import db, Appointment, Medication, Delivery, Notification
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+from ..models import db, Appointment, Medication, Delivery, Notification, Patient, User
 from ..utils import role_required
+from . import DASHBOARD_DATA_CACHE_TIMEOUT, dashboard_data_cache_key, extensions
 import logging
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
+def utc_now():
+    """
+    Current UTC time as a naive datetime, matching the naive UTC columns.
+    Replaces the deprecated datetime.utcnow().
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def count_stats(**counts):
+    """
+    Run several COUNT(*) queries as scalar subqueries of a single SELECT.
+    Each keyword maps a stat name to (model, *criteria); returns {name: count}.
+    """
+    columns = [
+        select(func.count()).select_from(model).where(*criteria).scalar_subquery().label(name)
+        for name, (model, *criteria) in counts.items()
+    ]
+    return db.session.execute(select(*columns)).one()._asdict()
+
+def _empty_stats():
+    """Defaults for every dashboard card, so templates can rely on each key."""
+    return {
+        'total_patients': 0,
+        'upcoming_appointments': 0,
+        'active_medications': 0,
+        'pending_deliveries': 0,
+        'recent_activities': [],
+        'upcoming_schedule': []
+    }
+
+def _admin_dashboard(user, now):
+    """Admin sees counts for all users."""
+    stats = _empty_stats()
+    stats.update(count_stats(
+        total_patients=(User, User.role == 'patient'),
+        upcoming_appointments=(Appointment, Appointment.start_time >= now),
+        active_medications=(Medication, Medication.status == 'active'),
+        pending_deliveries=(Delivery, Delivery.status == 'pending')
+    ))
+    
+    # Get recent activities (last 10)
+    stats['recent_activities'] = ActivityLog.query.order_by(
+        ActivityLog.timestamp.desc()
+    ).limit(10).all()
+    
+    # Get upcoming schedule (next 7 days)
+    stats['upcoming_schedule'] = Appointment.query.options(
+        joinedload(Appointment.patient)
+    ).filter(
+        Appointment.start_time.between(now, now + timedelta(days=7))
+    ).order_by(Appointment.start_time.asc()).limit(10).all()
+    
+    return 'dashboard/admin_dashboard.html', stats
+
+def _caregiver_dashboard(user, now):
+    """Caregiver sees their assigned patients and related data."""
+    stats = _empty_stats()
+    # The assigned patient IDs are a subquery shared by every filter
+    patient_ids = select(Patient.id).where(
+        Patient.assigned_caregiver_id == user.id
+    )
+    stats.update(count_stats(
+        total_patients=(Patient, Patient.assigned_caregiver_id == user.id),
+        upcoming_appointments=(
+            Appointment,
+            Appointment.caregiver_id == user.id,
+            Appointment.start_time >= now
+        ),
+        active_medications=(
+            Medication,
+            Medication.patient_id.in_(patient_ids),
+            Medication.status == 'active'
+        ),
+        pending_deliveries=(
+            Delivery,
+            Delivery.patient_id.in_(patient_ids),
+            Delivery.status == 'pending'
+        )
+    ))
+    
+    # Get recent activities for assigned patients
+    stats['recent_activities'] = ActivityLog.query.filter(
+        ActivityLog.user_id.in_(patient_ids)
+    ).order_by(ActivityLog.timestamp.desc()).limit(10).all()
+    
+    # Get upcoming schedule for caregiver
+    stats['upcoming_schedule'] = Appointment.query.options(
+        joinedload(Appointment.patient)
+    ).filter(
+        Appointment.caregiver_id == user.id,
+        Appointment.start_time.between(now, now + timedelta(days=7))
+    ).order_by(Appointment.start_time.asc()).limit(10).all()
+    
+    return 'dashboard/caregiver_dashboard.html', stats
+
+def _patient_dashboard(user, now):
+    """Patient sees their own data."""
+    stats = _empty_stats()
+    stats.update(count_stats(
+        upcoming_appointments=(
+            Appointment,
+            Appointment.patient_id == user.id,
+            Appointment.start_time >= now
+        ),
+        active_medications=(
+            Medication,
+            Medication.patient_id == user.id,
+            Medication.status == 'active'
+        ),
+        pending_deliveries=(
+            Delivery,
+            Delivery.patient_id == user.id,
+            Delivery.status == 'pending'
+        )
+    ))
+    
+    # Get recent activities for the patient
+    stats['recent_activities'] = ActivityLog.query.filter_by(
+        user_id=user.id
+    ).order_by(ActivityLog.timestamp.desc()).limit(10).all()
+    
+    # Get upcoming schedule for the patient
+    stats['upcoming_schedule'] = Appointment.query.options(
+        joinedload(Appointment.patient)
+    ).filter(
+        Appointment.patient_id == user.id,
+        Appointment.start_time.between(now, now + timedelta(days=7))
+    ).order_by(Appointment.start_time.asc()).limit(10).all()
+    
+    return 'dashboard/patient_dashboard.html', stats
+
+# Role -> handler(user, now) returning (template_name, stats); unknown roles get the patient view
+DASHBOARD_HANDLERS = {
+    'admin': _admin_dashboard,
+    'caregiver': _caregiver_dashboard,
+    'patient': _patient_dashboard,
+}
+
 def create_dashboard_blueprint():
     dashboard_bp = Blueprint('dashboard', __name__)
+    cache = extensions['cache']
 
     @dashboard_bp.route('/')
     @login_required
     def index():
         try:
-            # Get counts for dashboard cards
-            stats = {
-                'total_patients': 0,
-                'upcoming_appointments': 0,
-                'active_medications': 0,
-                'pending_deliveries': 0,
-                'recent_activities': [],
-                'upcoming_schedule': []
-            }
-
-            # Get counts based on user role
-            if current_user.role == 'admin':
-                # Admin sees counts for all users
-                stats['total_patients'] = User.query.filter_by(role='patient').count()
-                stats['upcoming_appointments'] = Appointment.query.filter(
-                    Appointment.start_time >= datetime.utcnow()
-                ).count()
-                stats['active_medications'] = Medication.query.filter_by(status='active').count()
-                stats['pending_deliveries'] = Delivery.query.filter_by(status='pending').count()
-                
-                # Get recent activities (last 10)
-                stats['recent_activities'] = ActivityLog.query.order_by(
-                    ActivityLog.timestamp.desc()
-                ).limit(10).all()
-                
-                # Get upcoming schedule (next 7 days)
-                stats['upcoming_schedule'] = Appointment.query.filter(
-                    Appointment.start_time.between(
-                        datetime.utcnow(),
-                        datetime.utcnow() + timedelta(days=7)
-                    )
-                ).order_by(Appointment.start_time.asc()).limit(10).all()
-                
-                return render_template('dashboard/admin_dashboard.html', **stats)
-                
-            elif current_user.role == 'caregiver':
-                # Caregiver sees their assigned patients and related data
-                stats['total_patients'] = current_user.assigned_patients.count()
-                stats['upcoming_appointments'] = Appointment.query.filter(
-                    Appointment.caregiver_id == current_user.id,
-                    Appointment.start_time >= datetime.utcnow()
-                ).count()
-                
-                # Get medications for assigned patients
-                patient_ids = [p.id for p in current_user.assigned_patients]
-                stats['active_medications'] = Medication.query.filter(
-                    Medication.patient_id.in_(patient_ids),
-                    Medication.status == 'active'
-                ).count()
-                
-                stats['pending_deliveries'] = Delivery.query.filter(
-                    Delivery.patient_id.in_(patient_ids),
-                    Delivery.status == 'pending'
-                ).count()
-                
-                # Get recent activities for assigned patients
-                stats['recent_activities'] = ActivityLog.query.filter(
-                    ActivityLog.user_id.in_(patient_ids)
-                ).order_by(ActivityLog.timestamp.desc()).limit(10).all()
-                
-                # Get upcoming schedule for caregiver
-                stats['upcoming_schedule'] = Appointment.query.filter(
-                    Appointment.caregiver_id == current_user.id,
-                    Appointment.start_time.between(
-                        datetime.utcnow(),
-                        datetime.utcnow() + timedelta(days=7)
-                    )
-                ).order_by(Appointment.start_time.asc()).limit(10).all()
-                
-                return render_template('dashboard/caregiver_dashboard.html', **stats)
-                
-            else:  # Patient
-                # Patient sees their own data
-                stats['upcoming_appointments'] = Appointment.query.filter(
-                    Appointment.patient_id == current_user.id,
-                    Appointment.start_time >= datetime.utcnow()
-                ).count()
-                
-                stats['active_medications'] = Medication.query.filter(
-                    Medication.patient_id == current_user.id,
-                    Medication.status == 'active'
-                ).count()
-                
-                stats['pending_deliveries'] = Delivery.query.filter(
-                    Delivery.patient_id == current_user.id,
-                    Delivery.status == 'pending'
-                ).count()
-                
-                # Get recent activities for the patient
-                stats['recent_activities'] = ActivityLog.query.filter_by(
-                    user_id=current_user.id
-                ).order_by(ActivityLog.timestamp.desc()).limit(10).all()
-                
-                # Get upcoming schedule for the patient
-                stats['upcoming_schedule'] = Appointment.query.filter(
-                    Appointment.patient_id == current_user.id,
-                    Appointment.start_time.between(
-                        datetime.utcnow(),
-                        datetime.utcnow() + timedelta(days=7)
-                    )
-                ).order_by(Appointment.start_time.asc()).limit(10).all()
-                
-                return render_template('dashboard/patient_dashboard.html', **stats)
+            handler = DASHBOARD_HANDLERS.get(current_user.role, _patient_dashboard)
+            # One clock reading per request keeps every window consistent
+            template_name, stats = handler(current_user, utc_now())
+            return render_template(template_name, **stats)
                 
         except Exception as e:
             logger.error(f"Error loading dashboard: {str(e)}")
             return render_template('errors/500.html'), 500
 
-    # API endpoint for dashboard data (used for AJAX updates)
+    # Cached per user; pass ?nocache=1 to bypass, errors are never cached
     @dashboard_bp.route('/api/dashboard-data')
     @login_required
+    @cache.cached(
+        timeout=DASHBOARD_DATA_CACHE_TIMEOUT,
+        key_prefix=lambda: dashboard_data_cache_key(current_user.id),
+        unless=lambda: bool(request.args.get('nocache')),
+        response_filter=lambda rv: not isinstance(rv, tuple)
+    )
     def get_dashboard_data():
         try:
             data = {
                 'status': 'success',
                 'data': {}
             }
+            now = utc_now()
             
-            # Get unread notifications count
-            unread_count = Notification.query.filter_by(
-                user_id=current_user.id,
-                is_read=False
-            ).count()
-            
-            data['data']['unread_notifications'] = unread_count
-            
-            # Get upcoming appointments count
-            upcoming_appointments = Appointment.query.filter(
-                Appointment.patient_id == current_user.id,
-                Appointment.start_time >= datetime.utcnow()
-            ).count()
-            
-            data['data']['upcoming_appointments'] = upcoming_appointments
-            
-            # Get pending deliveries count
-            pending_deliveries = Delivery.query.filter(
-                Delivery.patient_id == current_user.id,
-                Delivery.status == 'pending'
-            ).count()
-            
-            data['data']['pending_deliveries'] = pending_deliveries
+            # Unread notifications, upcoming appointments and pending
+            # deliveries, counted in one query
+            data['data'].update(count_stats(
+                unread_notifications=(
+                    Notification,
+                    Notification.user_id == current_user.id,
+                    Notification.is_read == False  # noqa: E712 - matches the partial index
+                ),
+                upcoming_appointments=(
+                    Appointment,
+                    Appointment.patient_id == current_user.id,
+                    Appointment.start_time >= now
+                ),
+                pending_deliveries=(
+                    Delivery,
+                    Delivery.patient_id == current_user.id,
+                    Delivery.status == 'pending'
+                )
+            ))
             
             return jsonify(data)
             
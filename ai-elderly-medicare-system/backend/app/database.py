@@ -2,53 +2,151 @@
 Database configuration and connection management for AI Elderly Medicare System
 """
 
-from sqlalchemy import create_engine, MetaData, event
+from sqlalchemy import create_engine, MetaData, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 from contextlib import contextmanager
+from functools import lru_cache
 import logging
 import os
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
-from app.config import settings
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
-# Create database engine based on database URL
-if settings.DATABASE_URL.startswith("sqlite"):
-    # SQLite configuration
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=settings.DATABASE_ECHO
-    )
+# Applied to every new SQLite connection: enforce foreign keys, let readers
+# proceed during writes (WAL), fsync only at checkpoints, and keep temp
+# tables plus a 64 MB page cache and 256 MB mmap window in memory
+SQLITE_PRAGMAS = (
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Connect listener applying SQLITE_PRAGMAS"""
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+# Engines and session factories are built on first use rather than at import,
+# so each worker process creates its own pool after the server forks
+
+@lru_cache(maxsize=1)
+def get_engine():
+    """Return the process-wide sync engine, creating it on first use"""
+    settings = get_settings()
+    if settings.DATABASE_URL.startswith("sqlite"):
+        # SQLite configuration; an in-memory database exists only on its one
+        # connection, a file database gets a real pool so threads don't
+        # queue behind a single connection
+        if ":memory:" in settings.DATABASE_URL:
+            pool_options = {"poolclass": StaticPool}
+        else:
+            pool_options = {"poolclass": QueuePool, "pool_size": 5, "max_overflow": 10}
+        engine = create_engine(
+            settings.DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+            echo=settings.DATABASE_ECHO,
+            **pool_options
+        )
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        return engine
     
-    # Enable foreign key constraints for SQLite
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
-        
-else:
     # PostgreSQL/MySQL configuration
-    engine = create_engine(
+    return create_engine(
         settings.DATABASE_URL,
         pool_pre_ping=True,
         pool_recycle=300,
         pool_size=10,
         max_overflow=20,
+        query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
         echo=settings.DATABASE_ECHO
     )
 
-# Create session factory
-SessionLocal = sessionmaker(
-    autocommit=False, 
-    autoflush=False, 
-    bind=engine
-)
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> sessionmaker:
+    """Return the session factory bound to get_engine()"""
+    return sessionmaker(
+        autocommit=False, 
+        autoflush=False, 
+        bind=get_engine()
+    )
+
+# Async drivers for each supported sync database URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    """
+    Map a sync database URL onto the matching async driver
+    """
+    scheme, sep, rest = url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+")[0])
+    return f"{driver}{sep}{rest}" if driver else url
+
+@lru_cache(maxsize=1)
+def get_async_engine():
+    """Return the process-wide async engine for async endpoints, creating it on first use"""
+    settings = get_settings()
+    if settings.DATABASE_URL.startswith("sqlite"):
+        async_engine = create_async_engine(
+            get_async_database_url(settings.DATABASE_URL),
+            query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+            echo=settings.DATABASE_ECHO
+        )
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+        return async_engine
+    
+    return create_async_engine(
+        get_async_database_url(settings.DATABASE_URL),
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_size=20,
+        max_overflow=20,
+        # asyncpg prepares every statement; keep the hot ones prepared per connection
+        connect_args={"prepared_statement_cache_size": 500},
+        query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+        echo=settings.DATABASE_ECHO
+    )
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker:
+    """
+    Return the async session factory; objects stay usable after commit
+    since async sessions cannot lazily reload expired attributes
+    """
+    return async_sessionmaker(
+        get_async_engine(),
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+# Names that resolve to the lazily built objects above
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "SessionLocal": get_sessionmaker,
+    "async_engine": get_async_engine,
+    "AsyncSessionLocal": get_async_sessionmaker,
+}
+
+def __getattr__(name):
+    """Keep ``from app.database import engine`` (etc.) working without building at import"""
+    factory = _LAZY_ATTRIBUTES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
 
 # Create base class for models
 Base = declarative_base()
@@ -60,7 +158,7 @@ def get_db() -> Generator[Session, None, None]:
     """
     Dependency to get database session for FastAPI endpoints
     """
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     except Exception as e:
@@ -70,13 +168,25 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get async database session for FastAPI endpoints
+    """
+    async with get_async_sessionmaker()() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            await db.rollback()
+            raise
+
 @contextmanager
 def get_db_context():
     """
     Context manager for database session
     Use this for operations outside of FastAPI endpoints
     """
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
         db.commit()
@@ -101,7 +211,7 @@ def init_db():
         )
         
         # Create all tables
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         logger.info("Database tables created successfully")
         
         # Create initial data if needed
@@ -117,7 +227,7 @@ def drop_db():
     WARNING: This will delete all data!
     """
     try:
-        Base.metadata.drop_all(bind=engine)
+        Base.metadata.drop_all(bind=get_engine())
         logger.info("Database tables dropped successfully")
     except Exception as e:
         logger.error(f"Error dropping database tables: {e}")
@@ -195,8 +305,9 @@ def check_db_connection():
     Check if database connection is working
     """
     try:
-        with get_db_context() as db:
-            db.execute("SELECT 1")
+        # A bare connection is enough; no session or transaction bookkeeping
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
         logger.info("Database connection successful")
         return True
     except Exception as e:
@@ -208,13 +319,13 @@ def get_db_info():
     Get database information
     """
     try:
-        with get_db_context() as db:
-            if settings.DATABASE_URL.startswith("sqlite"):
-                result = db.execute("SELECT sqlite_version()").fetchone()
-                return {"type": "SQLite", "version": result[0] if result else "Unknown"}
+        with get_engine().connect() as conn:
+            if get_settings().DATABASE_URL.startswith("sqlite"):
+                version = conn.scalar(text("SELECT sqlite_version()"))
+                return {"type": "SQLite", "version": version or "Unknown"}
             else:
-                result = db.execute("SELECT version()").fetchone()
-                return {"type": "PostgreSQL", "version": result[0] if result else "Unknown"}
+                version = conn.scalar(text("SELECT version()"))
+                return {"type": "PostgreSQL", "version": version or "Unknown"}
     except Exception as e:
         logger.error(f"Error getting database info: {e}")
         return {"type": "Unknown", "version": "Unknown"}
@@ -229,7 +340,7 @@ class DatabaseManager:
         """
         Create database backup (SQLite only)
         """
-        if not settings.DATABASE_URL.startswith("sqlite"):
+        if not get_settings().DATABASE_URL.startswith("sqlite"):
             raise NotImplementedError("Backup only supported for SQLite databases")
         
         import shutil
@@ -240,7 +351,7 @@ class DatabaseManager:
             backup_path = f"backup_elderly_medicare_{timestamp}.db"
         
         try:
-            db_path = settings.DATABASE_URL.replace("sqlite:///", "")
+            db_path = get_settings().DATABASE_URL.replace("sqlite:///", "")
             shutil.copy2(db_path, backup_path)
             logger.info(f"Database backup created: {backup_path}")
             return backup_path
@@ -253,13 +364,13 @@ class DatabaseManager:
         """
         Restore database from backup (SQLite only)
         """
-        if not settings.DATABASE_URL.startswith("sqlite"):
+        if not get_settings().DATABASE_URL.startswith("sqlite"):
             raise NotImplementedError("Restore only supported for SQLite databases")
         
         import shutil
         
         try:
-            db_path = settings.DATABASE_URL.replace("sqlite:///", "")
+            db_path = get_settings().DATABASE_URL.replace("sqlite:///", "")
             shutil.copy2(backup_path, db_path)
             logger.info(f"Database restored from: {backup_path}")
         except Exception as e:
@@ -295,7 +406,14 @@ __all__ = [
     "Base",
     "engine", 
     "SessionLocal",
+    "async_engine",
+    "AsyncSessionLocal",
+    "get_engine",
+    "get_sessionmaker",
+    "get_async_engine",
+    "get_async_sessionmaker",
     "get_db",
+    "get_async_db",
     "get_db_context",
     "init_db",
     "drop_db",
@@ -1,9 +1,54 @@
-# backend/app/deps.py
-from app.database import SessionLocal
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# backend/app/deps.py
+import threading
+
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db, get_sessionmaker
+from app.models.user import User
+from app.security import verify_token_cached
+
+security = HTTPBearer()
+
+def get_db():
+    db = get_sessionmaker()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Detached User rows for recently authenticated users, keyed by user ID and
+# shared by every router; each request merges a copy into its own session
+USER_CACHE_TTL = 30
+_user_cache = TTLCache(maxsize=10000, ttl=USER_CACHE_TTL)
+_user_cache_lock = threading.Lock()
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
+    """Get current authenticated user"""
+    # JWT decode and a possible revocation lookup in Redis are blocking; keep them off the event loop
+    payload = await run_in_threadpool(verify_token_cached, credentials.credentials)
+    user_id = payload.get("sub")
+    
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    
+    user_id = int(user_id)
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+    
+    if cached is None:
+        cached = await db.get(User, user_id)
+        
+        if not cached:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        
+        # Keep the cached instance out of any session so commits never expire it
+        db.expunge(cached)
+        with _user_cache_lock:
+            _user_cache[user_id] = cached
+    
+    # load=False attaches a copy without re-selecting the row
+    return await db.merge(cached, load=False)
@@ -1,10 +1,14 @@
 # backend/app/main.py
 from fastapi import FastAPI
-from app.database import engine, Base
+from fastapi.responses import ORJSONResponse
+from app.database import Base, get_engine
+from app.services.email_service import start_email_workers, stop_email_workers
+from app.services.medication_service import start_medication_worker, stop_medication_worker
+from app.security import start_revocation_refresher
 from app.api import api_router  # Import your API router
 
 # Initialize the FastAPI app
-app = FastAPI(title="AI Elderly Medicare System")
+app = FastAPI(title="AI Elderly Medicare System", default_response_class=ORJSONResponse)
 
 # Startup event to create database tables
 @app.on_event("startup")
@@ -13,7 +17,21 @@ def on_startup():
     Create all tables in the database if they do not exist.
     This function is called on the "startup" event of the FastAPI application.
     """
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
+
+@app.on_event("startup")
+async def start_background_workers():
+    """Start the paced email queue workers, the medication job worker and the revocation refresher."""
+    start_email_workers()
+    start_medication_worker()
+    # Load the revocation filter before traffic arrives rather than on the first request
+    start_revocation_refresher()
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    """Stop the email queue workers and the medication job worker."""
+    await stop_email_workers()
+    await stop_medication_worker()
 
 # Health check endpoint
 @app.get("/health", tags=["Health"])
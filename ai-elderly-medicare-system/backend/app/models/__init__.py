@@ -4,7 +4,7 @@ Database Models Package for AI Elderly Medicare System
 
 from .user import User, UserRole, UserStatus
 from .patient import Patient, Gender, BloodType
-from .medication import Medication, MedicationType, MedicationStatus
+from .medication import Medication, MedicationType, MedicationStatus, MedicationDoseNote
 from .appointment import Appointment, AppointmentType, AppointmentStatus, Priority
 from .notification import Notification, NotificationType, NotificationStatus
 from .delivery import Delivery, DeliveryStatus, DeliveryType
@@ -12,6 +12,7 @@ from .caregiver import Caregiver, CaregiverType, CaregiverStatus
 from .health_record import HealthRecord
 from .prescription import Prescription, PrescriptionStatus
 from .emergency_contact import EmergencyContact, RelationshipType
+from .verification_token import VerificationToken
 
 __all__ = [
     # User models
@@ -21,7 +22,7 @@ __all__ = [
     "Patient", "Gender", "BloodType",
     
     # Medication models
-    "Medication", "MedicationType", "MedicationStatus",
+    "Medication", "MedicationType", "MedicationStatus", "MedicationDoseNote",
     
     # Appointment models
     "Appointment", "AppointmentType", "AppointmentStatus", "Priority",
@@ -43,4 +44,7 @@ __all__ = [
     
     # Emergency contact models
     "EmergencyContact", "RelationshipType",
+    
+    # Verification token models
+    "VerificationToken",
 ]
\ No newline at end of file
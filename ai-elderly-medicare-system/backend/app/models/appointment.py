@@ -2,7 +2,7 @@
 Appointment model for scheduling patient visits and consultations
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -93,6 +93,12 @@ class Appointment(Base):
     patient = relationship("Patient", back_populates="appointments")
     provider = relationship("User", foreign_keys=[provider_id], back_populates="appointments_as_provider")
     
+    # Composite indexes for the per-patient and per-provider upcoming schedule
+    __table_args__ = (
+        Index("ix_appointments_patient_date", "patient_id", "appointment_date"),
+        Index("ix_appointments_provider_date", "provider_id", "appointment_date"),
+    )
+    
     def __repr__(self):
         return f"<Appointment(id={self.id}, patient_id={self.patient_id}, date='{self.appointment_date}', status='{self.status.value}')>"
     
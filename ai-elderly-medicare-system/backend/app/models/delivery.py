@@ -2,7 +2,7 @@
 Delivery model for medication and medical supply deliveries
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean, Enum, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean, Enum, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -134,6 +134,12 @@ class Delivery(Base):
     patient = relationship("Patient")
     medication = relationship("Medication", back_populates="deliveries")
     
+    # Per-patient delivery counts filter on (patient_id, status); deliveries is
+    # not created by any migration yet, so this index comes from create_all only
+    __table_args__ = (
+        Index("ix_deliveries_patient_status", "patient_id", "status"),
+    )
+    
     def __repr__(self):
         return f"<Delivery(id={self.id}, delivery_id='{self.delivery_id}', status='{self.status.value}', patient_id={self.patient_id})>"
     
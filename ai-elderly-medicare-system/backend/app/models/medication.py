@@ -2,7 +2,8 @@
 Medication model for tracking patient medications and prescriptions
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean, Enum, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean, Enum, JSON, Index, case, or_, text
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -43,6 +44,35 @@ class FrequencyType(enum.Enum):
     MONTHLY = "monthly"
     CUSTOM = "custom"
 
+# Minimum time between doses for each frequency
+DOSE_INTERVALS = {
+    FrequencyType.ONCE_DAILY: timedelta(hours=24),
+    FrequencyType.TWICE_DAILY: timedelta(hours=12),
+    FrequencyType.THREE_TIMES_DAILY: timedelta(hours=8),
+    FrequencyType.FOUR_TIMES_DAILY: timedelta(hours=6),
+    FrequencyType.WEEKLY: timedelta(hours=168),
+    FrequencyType.MONTHLY: timedelta(hours=720),
+    FrequencyType.AS_NEEDED: timedelta(hours=4),  # Minimum 4 hours between doses
+    FrequencyType.CUSTOM: timedelta(hours=24)
+}
+DEFAULT_DOSE_INTERVAL = timedelta(hours=24)
+
+# Known interacting drug pairs, keyed by the unordered pair of drug names
+DRUG_INTERACTIONS = {
+    frozenset(("warfarin", "aspirin")): {
+        "severity": "high",
+        "description": "Increased bleeding risk"
+    },
+}
+
+# Every drug name that appears in at least one known interaction
+INTERACTING_DRUGS = frozenset(drug for pair in DRUG_INTERACTIONS for drug in pair)
+
+def interacting_drugs_in(name: str) -> list:
+    """Known interacting drug names mentioned in a medication name"""
+    name = name.lower()
+    return [drug for drug in INTERACTING_DRUGS if drug in name]
+
 class Medication(Base):
     """Medication model for patient medication management"""
     
@@ -125,6 +155,20 @@ class Medication(Base):
     prescription = relationship("Prescription", back_populates="medications")
     deliveries = relationship("Delivery", back_populates="medication", cascade="all, delete-orphan")
     
+    # Indexes matching the medication list filters; (patient_id, status) lookups
+    # use the leading columns of the composite index. The partial index covers
+    # the per-patient active medication queries (enums are stored by name).
+    __table_args__ = (
+        Index("ix_medications_patient_status_critical", "patient_id", "status", "is_critical"),
+        # Keyset pagination of the list: filter by patient/status, seek and order by id
+        Index("ix_medications_patient_status_id", "patient_id", "status", "id"),
+        Index(
+            "ix_medications_patient_active", "patient_id",
+            postgresql_where=text("status = 'ACTIVE'"),
+            sqlite_where=text("status = 'ACTIVE'")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Medication(id={self.id}, name='{self.name}', patient_id={self.patient_id}, status='{self.status.value}')>"
     
@@ -231,18 +275,20 @@ class Medication(Base):
     def check_drug_interactions(self, other_medications: list):
         """Check for drug interactions with other medications"""
         # This would integrate with a drug interaction database
-        # For now, return placeholder data
+        # For now, look pairs up in the in-memory interaction table
         interactions = []
+        own_drugs = interacting_drugs_in(self.name)
+        if not own_drugs:
+            return interactions
         
         for med in other_medications:
-            if med.id != self.id:
-                # Placeholder interaction check
-                if "warfarin" in self.name.lower() and "aspirin" in med.name.lower():
-                    interactions.append({
-                        "medication": med.name,
-                        "severity": "high",
-                        "description": "Increased bleeding risk"
-                    })
+            if med.id == self.id:
+                continue
+            for other_drug in interacting_drugs_in(med.name):
+                for drug in own_drugs:
+                    interaction = DRUG_INTERACTIONS.get(frozenset((drug, other_drug)))
+                    if interaction:
+                        interactions.append({"medication": med.name, **interaction})
         
         return interactions
     
@@ -260,23 +306,38 @@ class Medication(Base):
         
         return common_side_effects.get(self.medication_type.value, [])
     
+    @hybrid_property
     def is_time_for_dose(self):
         """Check if it's time for next dose"""
         if not self.last_taken:
             return True
         
-        frequency_hours = {
-            FrequencyType.ONCE_DAILY: 24,
-            FrequencyType.TWICE_DAILY: 12,
-            FrequencyType.THREE_TIMES_DAILY: 8,
-            FrequencyType.FOUR_TIMES_DAILY: 6,
-            FrequencyType.WEEKLY: 168,
-            FrequencyType.MONTHLY: 720,
-            FrequencyType.AS_NEEDED: 4,  # Minimum 4 hours between doses
-            FrequencyType.CUSTOM: 24
-        }
-        
-        hours_since_last = (datetime.now() - self.last_taken).total_seconds() / 3600
-        required_interval = frequency_hours.get(self.frequency, 24)
-        
-        return hours_since_last >= required_interval
\ No newline at end of file
+        required_interval = DOSE_INTERVALS.get(self.frequency, DEFAULT_DOSE_INTERVAL)
+        return datetime.now() - self.last_taken >= required_interval
+    
+    @is_time_for_dose.expression
+    def is_time_for_dose(cls):
+        """SQL form of is_time_for_dose, for selecting due medications in a query"""
+        required_interval = case(DOSE_INTERVALS, value=cls.frequency, else_=DEFAULT_DOSE_INTERVAL)
+        return or_(cls.last_taken.is_(None), cls.last_taken <= func.now() - required_interval)
+
+class MedicationDoseNote(Base):
+    """Patient note recorded with a taken dose, appended as its own row"""
+    
+    __tablename__ = "medication_dose_notes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    medication_id = Column(Integer, ForeignKey("medications.id", ondelete="CASCADE"), nullable=False)
+    taken_at = Column(DateTime(timezone=True), nullable=False)
+    note = Column(Text, nullable=False)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Latest notes per medication are read newest first
+    __table_args__ = (
+        Index("ix_medication_dose_notes_medication_taken", "medication_id", "taken_at"),
+    )
+    
+    def __repr__(self):
+        return f"<MedicationDoseNote(id={self.id}, medication_id={self.medication_id})>"
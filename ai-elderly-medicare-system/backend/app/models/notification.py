@@ -2,7 +2,7 @@
 Notification model for system alerts and communications
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum, JSON, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -120,6 +120,16 @@ class Notification(Base):
     parent_notification = relationship("Notification", remote_side=[id])
     child_notifications = relationship("Notification", back_populates="parent_notification")
     
+    # Partial index for unread counts; only unread rows are indexed. Queries
+    # must compare is_read == False for the planner to match the predicate.
+    __table_args__ = (
+        Index(
+            "ix_notifications_user_unread", "user_id",
+            postgresql_where=text("NOT is_read"),
+            sqlite_where=text("is_read = 0")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Notification(id={self.id}, type='{self.notification_type.value}', user_id={self.user_id}, status='{self.status.value}')>"
     
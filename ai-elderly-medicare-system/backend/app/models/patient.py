@@ -23,7 +23,9 @@
 Patient model for elderly healthcare management
 """
 
-from sqlalchemy import Column, Integer, String, Date, DateTime, Float, Boolean, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, Boolean, Text, ForeignKey, Enum, Numeric
+from sqlalchemy import and_, case, cast, extract, literal
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -54,7 +56,7 @@ class Patient(Base):
     __tablename__ = "patients"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, index=True, nullable=False)
     
     # Personal Information
     patient_id = Column(String(20), unique=True, index=True, nullable=False)
@@ -107,7 +109,7 @@ class Patient(Base):
     def __repr__(self):
         return f"<Patient(id={self.id}, patient_id='{self.patient_id}', name='{self.user.full_name if self.user else 'Unknown'}')>"
     
-    @property
+    @hybrid_property
     def age(self):
         """Calculate patient's age"""
         if self.date_of_birth:
@@ -115,7 +117,20 @@ class Patient(Base):
             return today.year - self.date_of_birth.year - ((today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day))
         return None
     
-    @property
+    @age.expression
+    def age(cls):
+        """SQL form of age, so list queries get it computed in the row"""
+        today = func.current_date()
+        birthday_pending = (
+            extract("month", today) * 100 + extract("day", today)
+            < extract("month", cls.date_of_birth) * 100 + extract("day", cls.date_of_birth)
+        )
+        return cast(
+            extract("year", today) - extract("year", cls.date_of_birth) - case((birthday_pending, 1), else_=0),
+            Integer
+        )
+    
+    @hybrid_property
     def bmi(self):
         """Calculate BMI if height and weight are available"""
         if self.height and self.weight:
@@ -123,17 +138,39 @@ class Patient(Base):
             return round(self.weight / (height_m ** 2), 2)
         return None
     
-    @property
+    @bmi.expression
+    def bmi(cls):
+        """SQL form of bmi; NULL unless both measurements are set and non-zero"""
+        height_m = cls.height / 100.0
+        return case(
+            (and_(cls.height != 0, cls.weight != 0), func.round(cast(cls.weight / (height_m * height_m), Numeric), 2)),
+            else_=None
+        )
+    
+    @hybrid_property
     def is_elderly(self):
         """Check if patient is elderly (65+)"""
         return self.age and self.age >= 65
     
-    @property
+    @is_elderly.expression
+    def is_elderly(cls):
+        return cls.age >= 65
+    
+    @hybrid_property
     def full_address(self):
         """Get formatted full address"""
         parts = [self.address, self.city, self.state, self.zip_code, self.country]
         return ", ".join(filter(None, parts))
     
+    @full_address.expression
+    def full_address(cls):
+        """SQL form of full_address: non-empty parts joined with ', '"""
+        joined = literal("")
+        for part in (cls.address, cls.city, cls.state, cls.zip_code, cls.country):
+            joined = joined + case((func.coalesce(part, "") != "", ", " + part), else_="")
+        # Drop the leading separator
+        return func.substr(joined, 3)
+    
     def get_latest_health_record(self):
         """Get the most recent health record"""
         if self.health_records:
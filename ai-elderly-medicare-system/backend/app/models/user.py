@@ -1,7 +1,13 @@
 # backend/app/models/user.py
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, func
 from app.database import Base
 
+# Redis hash (user id -> ISO timestamp) buffering last_login writes from the
+# login route; drained into the users table by the flush_last_logins task
+LAST_LOGIN_KEY = "user:last_login"
+# The hash is renamed here while a flush runs and deleted only after the commit
+LAST_LOGIN_PROCESSING_KEY = "user:last_login:processing"
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -9,3 +15,13 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    last_login = Column(DateTime(timezone=True))  # created by migration 001
+
+    # Case-insensitive lookups used by the login/registration routes
+    __table_args__ = (
+        Index("ix_users_email_ci", func.lower(email), unique=True),
+        Index("ix_users_username_ci", func.lower(username), unique=True),
+    )
+
+    # Fetch server-generated defaults via INSERT ... RETURNING instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
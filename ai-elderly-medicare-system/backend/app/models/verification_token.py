@@ -0,0 +1,27 @@
+"""
+Verification token model for email verification and password reset links
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+class VerificationToken(Base):
+    """Single-use emailed token, stored only as the SHA-256 digest of the raw value"""
+    
+    __tablename__ = "verification_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    purpose = Column(String(20), nullable=False)  # "verify" or "reset"
+    token_hash = Column(LargeBinary(32), unique=True, index=True, nullable=False)
+    
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True))
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<VerificationToken(id={self.id}, user_id={self.user_id}, purpose='{self.purpose}')>"
@@ -2,7 +2,7 @@
 Authentication schemas for request/response validation
 """
 
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, validator
 from typing import Optional
 from datetime import datetime
 
@@ -60,8 +60,7 @@ class UserResponse(BaseModel):
     created_at: datetime
     last_login: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Token(BaseModel):
     """Schema for authentication token"""
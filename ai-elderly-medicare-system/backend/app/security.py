@@ -4,22 +4,196 @@ Security utilities for authentication and authorization
 
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from jose import JWTError, jwt
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+import bcrypt
+import redis
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+def _load_jwt_keys():
+    """Return the (signing, verifying) key pair for the configured JWT algorithm"""
+    if settings.ALGORITHM.startswith("HS"):
+        secret = settings.SECRET_KEY.encode()
+        return secret, secret
+    
+    # Asymmetric algorithms: parse the PEMs once instead of on every encode/decode
+    private_key = None
+    if settings.JWT_PRIVATE_KEY:
+        private_key = load_pem_private_key(settings.JWT_PRIVATE_KEY.encode(), password=None)
+    return private_key, load_pem_public_key(settings.JWT_PUBLIC_KEY.encode())
+
+# JWT keys built once for the process lifetime
+SIGNING_KEY, VERIFYING_KEY = _load_jwt_keys()
+
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# argon2id hasher for user passwords
+password_hasher = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# Recently verified token payloads, keyed by a truncated SHA-256 of the token
+TOKEN_CACHE_TTL = 30
+_token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings; may give false positives, never false negatives"""
+    
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item: str):
+        # Double hashing over one 128-bit digest instead of hash_count separate hashes
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+    
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+# Revoked token IDs (jti) live in a Redis sorted set scored by expiry. Each
+# process keeps a Bloom filter of them, rebuilt by a background thread, so
+# unrevoked tokens (nearly all) are cleared without a Redis round trip and
+# request paths never wait on a rebuild. verify_token/verify_token_cached may
+# still block on a Bloom-hit confirmation, so async callers run them in the threadpool
+REVOKED_TOKENS_KEY = "revoked_tokens"
+REVOCATION_REFRESH_SECONDS = 30
+revocation_store = redis.Redis.from_url(
+    settings.REDIS_URL,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+)
+_revoked: Optional[BloomFilter] = None  # None until the first load completes
+_revoked_lock = threading.Lock()
+_refresher_pid = None
+_warned_unloaded = False
+
+def _refresh_revoked() -> None:
+    """Rebuild the local filter from Redis to pick up revocations made by other workers"""
+    global _revoked
+    try:
+        jtis = revocation_store.zrangebyscore(REVOKED_TOKENS_KEY, time.time(), "+inf")
+    except redis.RedisError as e:
+        logger.warning(f"Could not load revoked tokens: {e}")
+        return
+    
+    bloom = BloomFilter(capacity=100000, error_rate=1e-4)
+    for jti in jtis:
+        bloom.add(jti.decode())
+    with _revoked_lock:
+        _revoked = bloom
+
+def _refresh_revoked_forever() -> None:
+    while True:
+        _refresh_revoked()
+        time.sleep(REVOCATION_REFRESH_SECONDS)
+
+def start_revocation_refresher() -> None:
+    """Start the refresh thread once per process (threads don't survive a fork)"""
+    global _refresher_pid, _revoked
+    if _refresher_pid == os.getpid():
+        return
+    with _revoked_lock:
+        if _refresher_pid == os.getpid():
+            return
+        if _refresher_pid is not None:
+            # Forked from a process with a loaded filter; rebuild before trusting it
+            _revoked = None
+        _refresher_pid = os.getpid()
+        threading.Thread(
+            target=_refresh_revoked_forever, name="token-revocation-refresh", daemon=True
+        ).start()
+
+def is_token_revoked(payload: Dict[str, Any]) -> bool:
+    """Check a decoded token against the revocation list"""
+    global _warned_unloaded
+    jti = payload.get("jti")
+    if jti is None:
+        return False
+    
+    start_revocation_refresher()
+    
+    revoked = _revoked
+    if revoked is None:
+        # No filter yet (fresh process, or Redis down since it started); don't
+        # turn a Redis outage into a 401 for every request
+        if not _warned_unloaded:
+            _warned_unloaded = True
+            logger.warning("Revocation list not loaded yet; accepting tokens without a revocation check")
+        return False
+    if jti not in revoked:
+        return False
+    
+    # Possible false positive; Redis holds the authoritative list
+    try:
+        return revocation_store.zscore(REVOKED_TOKENS_KEY, jti) is not None
+    except redis.RedisError as e:
+        logger.warning(f"Could not confirm token revocation: {e}")
+        return True
+
+def revoke_token(token: str) -> None:
+    """Revoke a token until it expires"""
+    payload = verify_token(token)
+    jti = payload.get("jti")
+    if jti is None:
+        # Issued before tokens carried a jti; it simply runs to expiry
+        return
+    
+    pipe = revocation_store.pipeline()
+    pipe.zadd(REVOKED_TOKENS_KEY, {jti: payload["exp"]})
+    pipe.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", time.time())
+    pipe.execute()
+    
+    with _revoked_lock:
+        if _revoked is not None:
+            _revoked.add(jti)
+    with _token_cache_lock:
+        _token_cache.pop(_token_cache_key(token), None)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password.startswith("$argon2"):
+        try:
+            return password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    # Hashes created before the argon2id switch are bcrypt
+    try:
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except ValueError:
+        # Malformed or unknown hash
+        return False
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
@@ -30,8 +204,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    encoded_jwt = jwt.encode(to_encode, SIGNING_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
 
@@ -44,18 +218,44 @@ def verify_token(token: str) -> Dict[str, Any]:
     )
     
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
+        payload = jwt.decode(token, VERIFYING_KEY, algorithms=[settings.ALGORITHM], leeway=settings.JWT_LEEWAY_SECONDS)
+    except jwt.InvalidTokenError:
+        raise credentials_exception
+    
+    if is_token_revoked(payload):
         raise credentials_exception
+    
+    return payload
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+def verify_token_cached(token: str) -> Dict[str, Any]:
+    """Verify and decode JWT token, skipping signature checks for recently seen tokens"""
+    key = _token_cache_key(token)
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    
+    if cached is not None:
+        payload, valid_until = cached
+        if valid_until > time.time() and not is_token_revoked(payload):
+            return payload
+    
+    payload = verify_token(token)
+    # Never serve a cached payload past the token's own expiry
+    valid_until = min(payload.get("exp", 0), time.time() + TOKEN_CACHE_TTL)
+    with _token_cache_lock:
+        _token_cache[key] = (payload, valid_until)
+    
+    return payload
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
     """Create JWT refresh token"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, SIGNING_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 class PermissionChecker:
@@ -2,19 +2,28 @@
 Authentication service for user management and security operations
 """
 
+from fastapi import Depends
+from sqlalchemy import or_, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
 import secrets
 import logging
 
+from app.database import get_db
 from app.models.user import User, UserRole, UserStatus
+from app.models.verification_token import VerificationToken
 from app.security import get_password_hash, verify_password, create_access_token
 from app.utils.exceptions import AuthenticationError, ValidationError
 from app.utils.validators import validate_email, validate_password
 
 logger = logging.getLogger(__name__)
 
+# Lifetime of emailed tokens
+VERIFICATION_TOKEN_TTL = timedelta(hours=24)
+PASSWORD_RESET_TOKEN_TTL = timedelta(hours=1)
+
 class AuthService:
     """Service class for authentication operations"""
     
@@ -34,10 +43,11 @@ class AuthService:
                 raise ValidationError("Password does not meet requirements")
             
             # Check if user already exists
-            if self.get_user_by_email(email):
+            conflict = self.find_email_or_username_conflict(email, username)
+            if conflict == "email":
                 raise ValidationError("Email already registered")
             
-            if self.get_user_by_username(username):
+            if conflict == "username":
                 raise ValidationError("Username already taken")
             
             # Create user
@@ -103,6 +113,22 @@ class AuthService:
             logger.error(f"Error getting user by ID: {e}")
             return None
     
+    def get_active_user_for_jwt(self, user_id: int) -> Optional[User]:
+        """Get the active user a token's subject refers to, in one primary-key lookup"""
+        try:
+            return self.db.query(User).filter(User.id == user_id, User.is_active == True).first()
+        except Exception as e:
+            logger.error(f"Error getting user for token: {e}")
+            return None
+    
+    def is_user_active(self, user_id: int) -> bool:
+        """Check a user's active flag without loading the row"""
+        try:
+            return bool(self.db.query(User.is_active).filter(User.id == user_id).scalar())
+        except Exception as e:
+            logger.error(f"Error checking user active flag: {e}")
+            return False
+    
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
         try:
@@ -119,6 +145,17 @@ class AuthService:
             logger.error(f"Error getting user by email: {e}")
             return None
     
+    def find_email_or_username_conflict(self, email: str, username: str) -> Optional[str]:
+        """Return "email" or "username" if either is already registered, in one query"""
+        email, username = email.lower(), username.lower()
+        row = self.db.query(User.email, User.username).filter(
+            or_(User.email == email, User.username == username)
+        ).first()
+        
+        if row is None:
+            return None
+        return "email" if row.email == email else "username"
+    
     def update_last_login(self, user_id: int) -> bool:
         """Update user's last login timestamp"""
         try:
@@ -237,12 +274,7 @@ class AuthService:
     def generate_verification_token(self, user_id: int) -> str:
         """Generate email verification token"""
         try:
-            # In production, store this token in database with expiration
-            token = secrets.token_urlsafe(32)
-            
-            # For now, we'll use a simple token format
-            # In production, use JWT or store in database
-            verification_token = f"verify_{user_id}_{token}"
+            verification_token = self._issue_token("verify", user_id, VERIFICATION_TOKEN_TTL)
             
             logger.info(f"Verification token generated for user ID: {user_id}")
             return verification_token
@@ -254,15 +286,7 @@ class AuthService:
     def verify_email_token(self, token: str) -> Optional[int]:
         """Verify email verification token"""
         try:
-            # Simple token verification (in production, use proper JWT or database lookup)
-            if token.startswith("verify_"):
-                parts = token.split("_")
-                if len(parts) >= 3:
-                    user_id = int(parts[1])
-                    # In production, verify token expiration and validity
-                    return user_id
-            
-            return None
+            return self._consume_token("verify", token)
             
         except Exception as e:
             logger.error(f"Error verifying email token: {e}")
@@ -271,11 +295,7 @@ class AuthService:
     def generate_password_reset_token(self, user_id: int) -> str:
         """Generate password reset token"""
         try:
-            # In production, store this token in database with expiration
-            token = secrets.token_urlsafe(32)
-            
-            # For now, we'll use a simple token format
-            reset_token = f"reset_{user_id}_{token}"
+            reset_token = self._issue_token("reset", user_id, PASSWORD_RESET_TOKEN_TTL)
             
             logger.info(f"Password reset token generated for user ID: {user_id}")
             return reset_token
@@ -285,22 +305,86 @@ class AuthService:
             raise
     
     def verify_password_reset_token(self, token: str) -> Optional[int]:
-        """Verify password reset token"""
+        """Verify password reset token
+        
+        Only the SHA-256 digest of the raw token is stored; it is matched via
+        the unique token_hash index.
+        """
         try:
-            # Simple token verification (in production, use proper JWT or database lookup)
-            if token.startswith("reset_"):
-                parts = token.split("_")
-                if len(parts) >= 3:
-                    user_id = int(parts[1])
-                    # In production, verify token expiration and validity
-                    return user_id
-            
-            return None
+            return self._consume_token("reset", token)
             
         except Exception as e:
             logger.error(f"Error verifying reset token: {e}")
             return None
     
+    def reset_password_with_token(self, token: str, new_password: str) -> bool:
+        """Consume a reset token and set the new password in one transaction
+        
+        Returns False for an invalid, expired or already used token. If the
+        password update fails the token is left unused.
+        """
+        if not validate_password(new_password):
+            raise ValidationError("Password does not meet requirements")
+        
+        # Hash before consuming so the token row isn't held during the slow hash
+        hashed_password = get_password_hash(new_password)
+        try:
+            user_id = self._consume_token("reset", token, commit=False)
+            if user_id is None:
+                return False
+            
+            user = self.get_user_by_id(user_id)
+            if not user:
+                self.db.rollback()
+                return False
+            
+            user.hashed_password = hashed_password
+            self.db.commit()
+            
+            logger.info(f"Password reset for user: {user.username}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error resetting password with token: {e}")
+            self.db.rollback()
+            raise
+    
+    def _issue_token(self, purpose: str, user_id: int, ttl: timedelta) -> str:
+        """Create a random single-use token and store its digest"""
+        token = secrets.token_urlsafe(32)
+        self.db.add(VerificationToken(
+            user_id=user_id,
+            purpose=purpose,
+            token_hash=hashlib.sha256(token.encode()).digest(),
+            expires_at=datetime.utcnow() + ttl
+        ))
+        self.db.commit()
+        return token
+    
+    def _consume_token(self, purpose: str, token: str, commit: bool = True) -> Optional[int]:
+        """
+        Mark a valid, unexpired token as used and return its user ID.
+        A single conditional UPDATE ... RETURNING, so concurrent redemptions
+        of the same token can't both succeed.
+        """
+        now = datetime.utcnow()
+        user_id = self.db.execute(
+            update(VerificationToken)
+            .where(
+                VerificationToken.token_hash == hashlib.sha256(token.encode()).digest(),
+                VerificationToken.purpose == purpose,
+                VerificationToken.used_at.is_(None),
+                VerificationToken.expires_at > now
+            )
+            .values(used_at=now)
+            .returning(VerificationToken.user_id)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+        
+        if commit:
+            self.db.commit()
+        return user_id
+    
     def update_user_profile(self, user_id: int, **kwargs) -> bool:
         """Update user profile information"""
         try:
@@ -397,4 +481,8 @@ class AuthService:
             
         except Exception as e:
             logger.error(f"Error checking user permissions: {e}")
-            return False
\ No newline at end of file
+            return False
+
+def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
+    """FastAPI dependency providing one AuthService per request"""
+    return AuthService(db)
@@ -2,17 +2,21 @@
 Email service for sending notifications and communications
 """
 
+import asyncio
 import smtplib
 import ssl
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 import logging
+import threading
 from datetime import datetime
 import os
 
+from fastapi.concurrency import run_in_threadpool
+
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -27,6 +31,10 @@ class EmailService:
         self.password = settings.EMAIL_PASSWORD
         self.from_email = settings.EMAIL_USERNAME
         self.from_name = "AI Medicare System"
+        
+        # One SMTP connection kept open across sends; the lock serializes use of it
+        self._server = None
+        self._lock = threading.Lock()
     
     def _create_smtp_connection(self):
         """Create SMTP connection"""
@@ -40,6 +48,12 @@ class EmailService:
             logger.error(f"Failed to create SMTP connection: {e}")
             raise
     
+    def _get_connection(self):
+        """Return the pooled SMTP connection, opening it if needed"""
+        if self._server is None:
+            self._server = self._create_smtp_connection()
+        return self._server
+    
     def send_email(self, to_email: str, subject: str, body: str, 
                    html_body: Optional[str] = None, attachments: Optional[List[str]] = None) -> bool:
         """Send email with optional HTML body and attachments"""
@@ -74,9 +88,14 @@ class EmailService:
                         )
                         message.attach(part)
             
-            # Send email
-            with self._create_smtp_connection() as server:
-                server.send_message(message)
+            # Send email over the pooled connection
+            with self._lock:
+                try:
+                    self._get_connection().send_message(message)
+                except smtplib.SMTPServerDisconnected:
+                    # The server closed the idle connection; reconnect once
+                    self._server = None
+                    self._get_connection().send_message(message)
             
             logger.info(f"Email sent successfully to: {to_email}")
             return True
@@ -520,4 +539,60 @@ AI Medicare System Team
             
         except Exception as e:
             logger.error(f"Failed to send welcome email: {e}")
-            return False
\ No newline at end of file
+            return False
+
+# Shared instance so callers reuse its SMTP connection
+email_service = EmailService()
+
+# In-process email queue drained by a few paced workers, so bursts of signups
+# or reset requests stay under the SMTP provider's rate limit
+_email_queue: Optional[asyncio.Queue] = None
+_email_workers: List[asyncio.Task] = []
+
+async def _email_worker():
+    """
+    Send queued emails one at a time, pacing so every worker in every server
+    process together respects EMAIL_SEND_RATE
+    """
+    interval = settings.EMAIL_WORKERS * settings.WEB_CONCURRENCY / settings.EMAIL_SEND_RATE
+    while True:
+        send, args = await _email_queue.get()
+        try:
+            await run_in_threadpool(send, *args)
+        except Exception as e:
+            logger.error(f"Queued email failed: {e}")
+        finally:
+            _email_queue.task_done()
+        await asyncio.sleep(interval)
+
+def start_email_workers():
+    """Create the queue and its workers on the running event loop (app startup)"""
+    global _email_queue
+    _email_queue = asyncio.Queue(maxsize=settings.EMAIL_QUEUE_SIZE)
+    for _ in range(settings.EMAIL_WORKERS):
+        _email_workers.append(asyncio.create_task(_email_worker()))
+
+async def stop_email_workers():
+    """Let the workers finish queued emails, up to EMAIL_DRAIN_TIMEOUT, then cancel them (app shutdown)"""
+    if _email_queue is not None and _email_workers:
+        try:
+            await asyncio.wait_for(_email_queue.join(), timeout=settings.EMAIL_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"Email queue not drained on shutdown; {_email_queue.qsize()} emails dropped")
+    for task in _email_workers:
+        task.cancel()
+    await asyncio.gather(*_email_workers, return_exceptions=True)
+    _email_workers.clear()
+
+def _log_email_failure(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Email send failed: {future.exception()}")
+
+async def enqueue_email(send: Callable[..., Any], *args) -> None:
+    """Queue a blocking email send; waits for room when the queue is full"""
+    if _email_queue is None:
+        # Workers not started (e.g. app used without lifespan events); send in the threadpool
+        future = asyncio.get_running_loop().run_in_executor(None, send, *args)
+        future.add_done_callback(_log_email_failure)
+        return
+    await _email_queue.put((send, args))
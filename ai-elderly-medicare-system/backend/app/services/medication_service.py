@@ -0,0 +1,75 @@
+"""
+Background job queue for medication follow-up work (reminders, dose confirmations)
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from app.config import settings
+from app.database import get_async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+MedicationJob = Callable[..., Awaitable[Any]]
+
+# Bounded queue drained by a single worker, so bursts of medication writes
+# hold at most one extra pooled connection instead of one per request
+_medication_queue: Optional[asyncio.Queue] = None
+_medication_worker: Optional[asyncio.Task] = None
+# Jobs run detached when no worker is started; referenced until done so they
+# aren't garbage-collected mid-run
+_detached_jobs: Set[asyncio.Task] = set()
+
+async def _run_medication_job(job: MedicationJob, args: tuple) -> None:
+    """Run one job in its own session, committed on success and released as soon as the job finishes"""
+    async with get_async_sessionmaker()() as db:
+        try:
+            await job(db, *args)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+def _detached_job_done(task: asyncio.Task) -> None:
+    _detached_jobs.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Medication job %s failed: %s", task.get_name(), task.exception())
+
+async def _medication_job_worker():
+    """Run queued medication jobs one at a time"""
+    while True:
+        job, args = await _medication_queue.get()
+        try:
+            await _run_medication_job(job, args)
+        except Exception as e:
+            logger.error("Medication job %s failed: %s", job.__name__, e)
+        finally:
+            _medication_queue.task_done()
+
+def start_medication_worker():
+    """Create the queue and its worker on the running event loop (app startup)"""
+    global _medication_queue, _medication_worker
+    _medication_queue = asyncio.Queue(maxsize=settings.MEDICATION_JOB_QUEUE_SIZE)
+    _medication_worker = asyncio.create_task(_medication_job_worker())
+
+async def stop_medication_worker():
+    """Cancel the worker (app shutdown)"""
+    global _medication_worker
+    if _medication_worker is not None:
+        _medication_worker.cancel()
+        await asyncio.gather(_medication_worker, return_exceptions=True)
+        _medication_worker = None
+
+async def enqueue_medication_job(job: MedicationJob, *args) -> None:
+    """
+    Queue ``job(db, *args)`` to run with its own AsyncSession; waits for
+    room when the queue is full
+    """
+    if _medication_queue is None:
+        # Worker not started (e.g. app used without lifespan events); run it detached
+        task = asyncio.get_running_loop().create_task(_run_medication_job(job, args), name=job.__name__)
+        _detached_jobs.add(task)
+        task.add_done_callback(_detached_job_done)
+        return
+    await _medication_queue.put((job, args))
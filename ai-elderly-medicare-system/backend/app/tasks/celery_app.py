@@ -78,6 +78,13 @@ celery_app.conf.beat_schedule = {
         'options': {'queue': 'scheduled'}
     },
     
+    # Flush buffered last_login timestamps every minute
+    'flush-last-logins': {
+        'task': 'app.tasks.scheduled_tasks.flush_last_logins',
+        'schedule': 60.0,
+        'options': {'queue': 'scheduled'}
+    },
+    
     # Check for health alerts every 30 minutes
     'check-health-alerts': {
         'task': 'app.tasks.scheduled_tasks.check_health_alerts',
@@ -16,12 +16,16 @@ from app.models.notification import Notification, NotificationStatus
 
 logger = logging.getLogger(__name__)
 
+# Shared by every task in a worker process so the SMTP connection (and its
+# TLS handshake) is reused across sends; it is opened lazily, after the fork
+worker_email_service = EmailService()
+
 @celery_app.task(bind=True, name='send_email')
 def send_email(self, to_email: str, subject: str, body: str, 
                html_body: Optional[str] = None, attachments: Optional[List[str]] = None):
     """Send a single email"""
     try:
-        email_service = EmailService()
+        email_service = worker_email_service
         success = email_service.send_email(to_email, subject, body, html_body, attachments)
         
         if success:
@@ -41,7 +45,7 @@ def send_bulk_email(self, recipients: List[str], subject: str, body: str,
                    html_body: Optional[str] = None):
     """Send bulk email to multiple recipients"""
     try:
-        email_service = EmailService()
+        email_service = worker_email_service
         results = email_service.send_bulk_email(recipients, subject, body, html_body)
         
         successful = sum(1 for success in results.values() if success)
@@ -72,7 +76,7 @@ def send_verification_email(self, user_id: int, verification_token: str):
                 logger.error(f'User not found for verification email: {user_id}')
                 return {'status': 'failed', 'error': 'User not found'}
             
-            email_service = EmailService()
+            email_service = worker_email_service
             success = email_service.send_verification_email(
                 user.email, 
                 user.first_name, 
@@ -100,7 +104,7 @@ def send_password_reset_email(self, user_id: int, reset_token: str):
                 logger.error(f'User not found for password reset email: {user_id}')
                 return {'status': 'failed', 'error': 'User not found'}
             
-            email_service = EmailService()
+            email_service = worker_email_service
             success = email_service.send_password_reset_email(
                 user.email, 
                 user.first_name, 
@@ -128,7 +132,7 @@ def send_welcome_email(self, user_id: int):
                 logger.error(f'User not found for welcome email: {user_id}')
                 return {'status': 'failed', 'error': 'User not found'}
             
-            email_service = EmailService()
+            email_service = worker_email_service
             success = email_service.send_welcome_email(
                 user.email, 
                 user.first_name, 
@@ -156,7 +160,7 @@ def send_appointment_reminder_email(self, patient_id: int, appointment_details:
                 logger.error(f'Patient not found for appointment reminder: {patient_id}')
                 return {'status': 'failed', 'error': 'Patient not found'}
             
-            email_service = EmailService()
+            email_service = worker_email_service
             success = email_service.send_appointment_reminder(
                 patient.user.email,
                 patient.user.full_name,
@@ -185,7 +189,7 @@ def send_medication_reminder_email(self, patient_id: int, medication_name: str,
                 logger.error(f'Patient not found for medication reminder: {patient_id}')
                 return {'status': 'failed', 'error': 'Patient not found'}
             
-            email_service = EmailService()
+            email_service = worker_email_service
             success = email_service.send_medication_reminder(
                 patient.user.email,
                 patient.user.full_name,
@@ -215,7 +219,7 @@ def send_health_alert_email(self, patient_id: int, alert_message: str, severity:
                 logger.error(f'Patient not found for health alert: {patient_id}')
                 return {'status': 'failed', 'error': 'Patient not found'}
             
-            email_service = EmailService()
+            email_service = worker_email_service
             success = email_service.send_health_alert(
                 patient.user.email,
                 patient.user.full_name,
@@ -256,7 +260,7 @@ def send_notification_email(self, notification_id: int):
             if notification.action_url and notification.action_text:
                 body += f"\n\n{notification.action_text}: {notification.action_url}"
             
-            email_service = EmailService()
+            email_service = worker_email_service
             success = email_service.send_email(
                 notification.user.email,
                 subject,
@@ -319,7 +323,7 @@ Best regards,
 AI Medicare System Team
             """.strip()
             
-            email_service = EmailService()
+            email_service = worker_email_service
             success = email_service.send_email(user.email, subject, body)
             
             if success:
@@ -353,7 +357,7 @@ Please investigate and take appropriate action.
 AI Medicare System
         """.strip()
         
-        email_service = EmailService()
+        email_service = worker_email_service
         results = email_service.send_bulk_email(admin_emails, subject, body)
         
         successful = sum(1 for success in results.values() if success)
@@ -6,14 +6,17 @@ from celery import current_task
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime, timedelta, time, date
+import redis
+from sqlalchemy import bindparam
 
+from app.config import settings
 from app.tasks.celery_app import celery_app
 from app.database import get_db_context, DatabaseManager
 from app.models.medication import Medication, MedicationStatus
 from app.models.appointment import Appointment, AppointmentStatus
 from app.models.notification import Notification, NotificationStatus, NotificationType
 from app.models.patient import Patient
-from app.models.user import User, UserRole
+from app.models.user import LAST_LOGIN_KEY, LAST_LOGIN_PROCESSING_KEY, User, UserRole
 from app.models.health_record import HealthRecord
 from app.models.prescription import Prescription, PrescriptionStatus
 from app.tasks.email_tasks import send_medication_reminder_email, send_appointment_reminder_email
@@ -31,44 +34,43 @@ def send_medication_reminders(self):
             # Get active medications that are due for a dose
             active_medications = db.query(Medication).filter(
                 Medication.status == MedicationStatus.ACTIVE,
-                Medication.patient_id.isnot(None)
+                Medication.patient_id.isnot(None),
+                Medication.is_time_for_dose
             ).all()
             
             reminders_sent = 0
             
             for medication in active_medications:
                 try:
-                    # Check if it's time for a dose
-                    if medication.is_time_for_dose():
-                        # Get patient information
-                        patient = medication.patient
-                        if not patient or not patient.user:
-                            continue
-                        
-                        # Create reminder notification
-                        notification = Notification.create_medication_reminder(
-                            user_id=patient.user_id,
-                            medication_id=medication.id
-                        )
-                        
-                        notification.message = f"Time to take your {medication.name}"
-                        if medication.dosage_amount and medication.dosage_unit:
-                            notification.message += f" ({medication.dosage_amount} {medication.dosage_unit})"
-                        
-                        notification.patient_id = patient.id
-                        
-                        db.add(notification)
-                        db.flush()
-                        
-                        # Send email reminder
-                        send_medication_reminder_email.delay(
-                            patient.id,
-                            medication.name,
-                            f"{medication.dosage_amount} {medication.dosage_unit}" if medication.dosage_amount else "As prescribed",
-                            now.strftime("%H:%M")
-                        )
-                        
-                        reminders_sent += 1
+                    # Get patient information
+                    patient = medication.patient
+                    if not patient or not patient.user:
+                        continue
+                    
+                    # Create reminder notification
+                    notification = Notification.create_medication_reminder(
+                        user_id=patient.user_id,
+                        medication_id=medication.id
+                    )
+                    
+                    notification.message = f"Time to take your {medication.name}"
+                    if medication.dosage_amount and medication.dosage_unit:
+                        notification.message += f" ({medication.dosage_amount} {medication.dosage_unit})"
+                    
+                    notification.patient_id = patient.id
+                    
+                    db.add(notification)
+                    db.flush()
+                    
+                    # Send email reminder
+                    send_medication_reminder_email.delay(
+                        patient.id,
+                        medication.name,
+                        f"{medication.dosage_amount} {medication.dosage_unit}" if medication.dosage_amount else "As prescribed",
+                        now.strftime("%H:%M")
+                    )
+                    
+                    reminders_sent += 1
                         
                 except Exception as e:
                     logger.error(f'Failed to send reminder for medication {medication.id}: {e}')
@@ -512,6 +514,59 @@ def backup_database(self):
         logger.error(f'Database backup task failed: {e}')
         raise self.retry(exc=e, countdown=600, max_retries=1)
 
+@celery_app.task(bind=True, name='flush_last_logins')
+def flush_last_logins(self):
+    """Write last_login timestamps buffered in Redis to the users table"""
+    try:
+        client = redis.Redis.from_url(settings.REDIS_URL)
+        
+        # Move the hash aside so logins arriving meanwhile land in a fresh one.
+        # A processing key left by a failed run is flushed first instead.
+        if not client.exists(LAST_LOGIN_PROCESSING_KEY):
+            try:
+                client.rename(LAST_LOGIN_KEY, LAST_LOGIN_PROCESSING_KEY)
+            except redis.ResponseError:
+                # RENAME fails when no logins have been buffered
+                return {'status': 'completed', 'users_updated': 0}
+        pending = client.hgetall(LAST_LOGIN_PROCESSING_KEY)
+        
+        if not pending:
+            return {'status': 'completed', 'users_updated': 0}
+        
+        users = User.__table__
+        rows = [
+            {'user_id': int(user_id), 'last_login': datetime.fromisoformat(ts.decode())}
+            for user_id, ts in pending.items()
+        ]
+        
+        try:
+            with get_db_context() as db:
+                db.execute(
+                    users.update()
+                    .where(users.c.id == bindparam('user_id'))
+                    .values(last_login=bindparam('last_login')),
+                    rows
+                )
+        except Exception:
+            # Put the entries back without overwriting logins recorded since
+            pipe = client.pipeline(transaction=True)
+            for user_id, ts in pending.items():
+                pipe.hsetnx(LAST_LOGIN_KEY, user_id, ts)
+            pipe.delete(LAST_LOGIN_PROCESSING_KEY)
+            pipe.execute()
+            raise
+        
+        # Only drop the buffered timestamps once they are committed
+        client.delete(LAST_LOGIN_PROCESSING_KEY)
+        
+        logger.info(f'Flushed last_login for {len(rows)} users')
+        
+        return {'status': 'completed', 'users_updated': len(rows)}
+        
+    except Exception as e:
+        logger.error(f'Flush last logins task failed: {e}')
+        raise self.retry(exc=e, countdown=30, max_retries=3)
+
 @celery_app.task(bind=True, name='generate_weekly_reports')
 def generate_weekly_reports(self):
     """Generate weekly system reports"""
@@ -2,9 +2,10 @@ import os
 import jwt
 import secrets
 import string
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from datetime import datetime, timedelta
-from flask import jsonify, request, current_app
+from flask import jsonify, request, current_app, render_template
 from flask_login import current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 import logging
@@ -91,28 +92,49 @@ def validate_password(password):
         return False, 'Password must contain at least one special character'
     return True, 'Password is valid'
 
+def _build_email(subject, recipients, template, **kwargs):
+    """Build a templated email message."""
+    from flask_mail import Message
+    
+    msg = Message(
+        subject=subject,
+        sender=current_app.config['MAIL_DEFAULT_SENDER'],
+        recipients=recipients
+    )
+    
+    # Render email template
+    msg.html = render_template(f'email/{template}.html', **kwargs)
+    return msg
+
 def send_email(subject, recipients, template, **kwargs):
     """Send an email using the specified template."""
     try:
-        from flask_mail import Message
         from . import mail
         
-        msg = Message(
-            subject=subject,
-            sender=current_app.config['MAIL_DEFAULT_SENDER'],
-            recipients=recipients
-        )
-        
-        # Render email template
-        msg.html = render_template(f'email/{template}.html', **kwargs)
-        
         # Send email
-        mail.send(msg)
+        mail.send(_build_email(subject, recipients, template, **kwargs))
         return True
     except Exception as e:
         logger.error(f"Error sending email: {str(e)}")
         return False
 
+# Sends mail off the request thread so SMTP latency never delays a response
+_mail_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='mail')
+
+def _send_built_email(app, msg):
+    from . import mail
+    
+    with app.app_context():
+        try:
+            mail.send(msg)
+        except Exception as e:
+            logger.error(f"Error sending email: {str(e)}")
+
+def send_email_async(subject, recipients, template, **kwargs):
+    """Render an email on the calling thread and send it in the background."""
+    msg = _build_email(subject, recipients, template, **kwargs)
+    _mail_executor.submit(_send_built_email, current_app._get_current_object(), msg)
+
 def log_activity(user_id, action, details=None):
     """Log user activity to the database."""
     try:
@@ -42,8 +42,16 @@ class Config:
     # CORS settings
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '').split(',')
     
+    # Cache settings
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')
+    CACHE_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_DEFAULT_TIMEOUT = 300
+    
     # Rate limiting
     RATELIMIT_DEFAULT = '200 per day;50 per hour'
+    RATELIMIT_STORAGE_URI = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    AUTH_RATE_LIMIT = int(os.environ.get('AUTH_RATE_LIMIT', 10))  # POSTs per window, per IP and per email
+    AUTH_RATE_LIMIT_WINDOW = 60  # seconds
     
     # API settings
     API_PREFIX = '/api/v1'
@@ -98,6 +106,9 @@ class TestingConfig(Config):
     # Disable CSRF protection in tests
     WTF_CSRF_ENABLED = False
     
+    # Don't cache across tests
+    CACHE_TYPE = 'NullCache'
+    
     # Disable rate limiting in tests
     RATELIMIT_DEFAULT = '5000 per day'
 
@@ -0,0 +1,27 @@
+"""Add case-insensitive lookup indexes on users
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Expression indexes so lower(email) / lower(username) lookups use an index seek
+    op.create_index('ix_users_email_ci', 'users', [sa.text('lower(email)')], unique=True)
+    op.create_index('ix_users_username_ci', 'users', [sa.text('lower(username)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_username_ci', table_name='users')
+    op.drop_index('ix_users_email_ci', table_name='users')
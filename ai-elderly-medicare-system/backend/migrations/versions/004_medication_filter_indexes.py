@@ -0,0 +1,40 @@
+"""Add medication filter indexes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Build the indexes without locking writes to medications (PostgreSQL only);
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_medications_patient_status_critical', 'medications',
+            ['patient_id', 'status', 'is_critical'], unique=False,
+            postgresql_concurrently=True
+        )
+        # Partial index for the per-patient active medication queries
+        op.create_index(
+            'ix_medications_patient_active', 'medications', ['patient_id'], unique=False,
+            postgresql_where=sa.text("status = 'ACTIVE'"),
+            sqlite_where=sa.text("status = 'ACTIVE'"),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_medications_patient_active', table_name='medications', postgresql_concurrently=True)
+        op.drop_index('ix_medications_patient_status_critical', table_name='medications', postgresql_concurrently=True)
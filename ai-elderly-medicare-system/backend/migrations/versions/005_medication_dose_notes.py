@@ -0,0 +1,37 @@
+"""Add medication_dose_notes table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('medication_dose_notes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('medication_id', sa.Integer(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('note', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['medication_id'], ['medications.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_medication_dose_notes_id'), 'medication_dose_notes', ['id'], unique=False)
+    # Latest notes per medication are read newest first
+    op.create_index('ix_medication_dose_notes_medication_taken', 'medication_dose_notes', ['medication_id', 'taken_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_medication_dose_notes_medication_taken', table_name='medication_dose_notes')
+    op.drop_index(op.f('ix_medication_dose_notes_id'), table_name='medication_dose_notes')
+    op.drop_table('medication_dose_notes')
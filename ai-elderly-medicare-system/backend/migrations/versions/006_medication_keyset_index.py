@@ -0,0 +1,30 @@
+"""Add medication keyset pagination index
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-03-20 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the list endpoint's cursor pages (id > cursor ORDER BY id) per patient/status
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_medications_patient_status_id', 'medications',
+            ['patient_id', 'status', 'id'], unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_medications_patient_status_id', table_name='medications', postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""Make patients.user_id unique
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-03-25 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One patient profile per user; create_patient relies on this to reject duplicates
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_user_id', 'patients',
+            ['user_id'], unique=True,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_patients_user_id', table_name='patients', postgresql_concurrently=True)
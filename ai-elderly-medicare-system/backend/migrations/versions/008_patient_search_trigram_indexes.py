@@ -0,0 +1,40 @@
+"""Add trigram indexes for patient search
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-03-28 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GIN trigram indexes serve the list endpoint's ILIKE '%term%' search; the
+    # expressions must match PATIENT_NAME_SEARCH / PATIENT_IDS_SEARCH exactly
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_name_trgm ON users USING gin "
+            "((coalesce(first_name, '') || ' ' || coalesce(last_name, '')) gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_patients_ids_trgm ON patients USING gin "
+            "((patient_id || ' ' || coalesce(medical_record_number, '')) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_patients_ids_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_name_trgm")
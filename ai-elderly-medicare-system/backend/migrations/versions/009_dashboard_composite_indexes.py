@@ -0,0 +1,46 @@
+"""Add composite indexes for dashboard counters
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-04-04 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY (PostgreSQL) cannot run inside a transaction, so
+    # a failed run leaves earlier indexes behind; IF NOT EXISTS makes it re-runnable
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_patient_date', 'appointments',
+            ['patient_id', 'appointment_date'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_appointments_provider_date', 'appointments',
+            ['provider_id', 'appointment_date'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        # Partial index: only unread notifications are counted per user
+        op.create_index(
+            'ix_notifications_user_unread', 'notifications', ['user_id'], unique=False,
+            postgresql_where=sa.text("NOT is_read"),
+            sqlite_where=sa.text("is_read = 0"),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notifications_user_unread', table_name='notifications', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_appointments_provider_date', table_name='appointments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_appointments_patient_date', table_name='appointments', postgresql_concurrently=True, if_exists=True)
@@ -5,13 +5,15 @@ Pytest configuration and fixtures for AI Elderly Medicare System tests
 import pytest
 import tempfile
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from datetime import datetime, date
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_async_db, get_async_database_url, get_db, set_sqlite_pragmas
 from app.models.user import User, UserRole, UserStatus
 from app.models.patient import Patient, Gender, BloodType
 from app.models.medication import Medication, MedicationType, MedicationStatus, FrequencyType
@@ -29,10 +31,25 @@ def engine():
         TEST_DATABASE_URL,
         connect_args={"check_same_thread": False}
     )
+    
+    # Enforce foreign keys like the application engine does
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(scope="session")
+def async_engine(engine):
+    """Create async engine on the same test database for async endpoints"""
+    async_engine = create_async_engine(
+        get_async_database_url(TEST_DATABASE_URL),
+        poolclass=NullPool
+    )
+    # Same pragmas as the sync engine; create_patient relies on the user FK
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return async_engine
+
 @pytest.fixture(scope="function")
 def db_session(engine):
     """Create database session for each test"""
@@ -46,7 +63,7 @@ def db_session(engine):
         session.close()
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(db_session, async_engine):
     """Create test client with database session override"""
     def override_get_db():
         try:
@@ -54,7 +71,14 @@ def client(db_session):
         finally:
             pass
     
+    TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     with TestClient(app) as test_client:
         yield test_client
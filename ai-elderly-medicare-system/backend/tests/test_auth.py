@@ -215,7 +215,7 @@ class TestTokenOperations:
         assert "access_token" in data
         assert data["token_type"] == "bearer"
         assert "expires_in" in data
-        assert "user" in data
+        assert "user" not in data
     
     def test_verify_token_valid(self, client, auth_headers_patient):
         """Test token verification with valid token"""
@@ -446,6 +446,28 @@ class TestAuthenticationSecurity:
         assert "username" in payload
         assert "exp" in payload
     
+    def test_cached_token_verification(self, patient_token):
+        """Test cached verification returns the same payload as a full decode"""
+        from app.security import verify_token_cached
+        
+        payload = verify_token(patient_token)
+        
+        assert verify_token_cached(patient_token) == payload
+        # Second call is served from the cache
+        assert verify_token_cached(patient_token) == payload
+    
+    def test_revocation_bloom_filter(self):
+        """Test the revocation Bloom filter never misses an added token ID"""
+        from app.security import BloomFilter
+        
+        bloom = BloomFilter(capacity=1000, error_rate=1e-4)
+        jtis = [f"jti-{i}" for i in range(1000)]
+        for jti in jtis:
+            bloom.add(jti)
+        
+        assert all(jti in bloom for jti in jtis)
+        assert "never-added" not in bloom
+    
     def test_sql_injection_protection(self, client):
         """Test protection against SQL injection in login"""
         malicious_data = {
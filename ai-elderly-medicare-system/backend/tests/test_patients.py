@@ -90,6 +90,29 @@ class TestPatientCreation:
                              headers=auth_headers_doctor)
         
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    def test_create_patients_bulk(self, client, auth_headers_doctor, sample_patient_data):
+        """Test bulk patient creation"""
+        response = client.post("/api/v1/patients/bulk", 
+                             json={"patients": [sample_patient_data]}, 
+                             headers=auth_headers_doctor)
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        created = response.json()["created"]
+        assert len(created) == 1
+        assert created[0]["user_id"] == sample_patient_data["user_id"]
+        assert created[0]["patient_id"].startswith("PAT-")
+    
+    def test_create_patients_bulk_duplicate(self, client, auth_headers_doctor, patient_record, sample_patient_data):
+        """Test bulk creation rejects users that already have a patient profile"""
+        sample_patient_data["user_id"] = patient_record.user_id
+        
+        response = client.post("/api/v1/patients/bulk", 
+                             json={"patients": [sample_patient_data]}, 
+                             headers=auth_headers_doctor)
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "already exists" in response.json()["detail"]
 
 
 class TestPatientRetrieval:
@@ -124,6 +147,25 @@ class TestPatientRetrieval:
         assert data["per_page"] == 5
         assert len(data["patients"]) <= 5
     
+    def test_get_patients_with_cursor(self, client, auth_headers_doctor, patient_record):
+        """Test keyset pagination after a given patient ID"""
+        response = client.get(f"/api/v1/patients/?cursor={patient_record.id - 1}&per_page=1", 
+                            headers=auth_headers_doctor)
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        
+        assert data["patients"][0]["id"] == patient_record.id
+        assert data["total"] is None
+        
+        # Nothing follows the last patient
+        response = client.get(f"/api/v1/patients/?cursor={patient_record.id}", 
+                            headers=auth_headers_doctor)
+        data = response.json()
+        
+        assert data["patients"] == []
+        assert data["next_cursor"] is None
+    
     def test_get_patients_with_search(self, client, auth_headers_doctor, patient_record):
         """Test patient list with search"""
         response = client.get(f"/api/v1/patients/?search={patient_record.user.first_name}", 
@@ -39,7 +39,7 @@ setup(
         "psycopg2-binary>=2.9.0",
         "alembic>=1.7.0",
         "pydantic>=1.8.0",
-        "python-jose>=3.3.0",
+        "PyJWT[crypto]>=2.8.0",
         "passlib>=1.7.4",
         "python-multipart>=0.0.5",
         "email-validator>=1.1.3",